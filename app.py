@@ -1,24 +1,27 @@
 # app.py
+from typing import Optional, Tuple
+
 from kivy.app import App
 from kivy.uix.screenmanager import ScreenManager, Screen, FadeTransition
 from kivy.uix.button import Button
 
 from board import Board
 from controller import GameController
-from themes import Theme
+from themes import load_theme
 from layout import TicTacToeLayout
 from homescreen import HomeScreen
+from sound_manager import get_audio
 
 # ------------------------------------------------------------------ #
-def create_game(mode: str = "friend", difficulty: str = "medium", element: str = "wood") -> TicTacToeLayout:
-    board      = Board()
+def create_game(mode: str = "friend", difficulty: str = "medium", element: str = "moc") -> TicTacToeLayout:
+    board      = Board(min_open_lines=1)
     controller = GameController(board, mode, difficulty)
-    theme      = Theme(element)
+    theme      = load_theme(element)
     return TicTacToeLayout(controller, theme)
 
 # ------------------------------------------------------------------ #
 class GameScreen(Screen):
-    """Screen that contains the game."""
+    """Screen that contains the game; built once and reused for every game."""
     
     def __init__(self, mode: str, difficulty: str = None, **kwargs):
         super().__init__(**kwargs)
@@ -35,6 +38,21 @@ class GameScreen(Screen):
         )
         self.back_btn.bind(on_release=self.go_back)
         self.add_widget(self.back_btn)
+
+    def new_game(self, mode: str, difficulty: str = None,
+                 size: Optional[Tuple[int, int, int]] = None):
+        """Reconfigure in place; a Board is only built when the size changes."""
+        self.mode, self.difficulty = mode, difficulty
+        board = self.game_widget.board
+        if size is not None and size != (board.rows, board.cols, board.win_len):
+            board = Board(*size, min_open_lines=1)
+        self.game_widget.new_game(mode, difficulty, board)
+
+    def on_pre_enter(self, *args):
+        self.game_widget.attach_window()
+
+    def on_leave(self, *args):
+        self.game_widget.detach_window()
     
     def go_back(self, instance):
         """Return to home screen."""
@@ -54,39 +72,33 @@ class TicTacToeApp(App):
         
         return self.sm
     
-    def start_game(self, mode: str, difficulty: str = None):
-        """Start a new game with the specified mode."""
-        # Remove old game screen if exists
+    def start_game(self, mode: str, difficulty: str = None,
+                   size: Optional[Tuple[int, int, int]] = None):
+        """Start a new game; *size* is (rows, cols, win_len), default 5×5/4."""
         if self.sm.has_screen('game'):
-            old_screen = self.sm.get_screen('game')
-            # Stop sounds before removing
-            if hasattr(old_screen, 'game_widget') and hasattr(old_screen.game_widget, '_sounds'):
-                if old_screen.game_widget._sounds.bg:
-                    old_screen.game_widget._sounds.bg.stop()
-            self.sm.remove_widget(old_screen)
-        
-        # Create new game screen
-        game_screen = GameScreen(mode, difficulty, name='game')
-        self.sm.add_widget(game_screen)
+            # reuse the screen, its controller and widgets
+            self.sm.get_screen('game').new_game(mode, difficulty, size)
+        else:
+            game_screen = GameScreen(mode, difficulty, name='game')
+            if size is not None:
+                game_screen.new_game(mode, difficulty, size)
+            self.sm.add_widget(game_screen)
         
         # Switch to game screen
         self.sm.current = 'game'
     
     def go_home(self):
         """Return to home screen."""
-        # Stop any playing sounds
         if self.sm.has_screen('game'):
             game_screen = self.sm.get_screen('game')
-            if hasattr(game_screen, 'game_widget') and hasattr(game_screen.game_widget, '_sounds'):
-                if game_screen.game_widget._sounds.bg:
-                    game_screen.game_widget._sounds.bg.stop()
+            # never let a late bot move land on a board nobody is looking at
+            game_screen.game_widget.cancel_ai()
         
         self.sm.current = 'home'
 
+    def on_start(self):
+        # decode every sound off the UI thread while the menu is showing
+        get_audio().preload()
+
     def on_stop(self):
-        # Clean up background music if still playing
-        if self.sm.current == 'game' and self.sm.has_screen('game'):
-            game_screen = self.sm.get_screen('game')
-            if hasattr(game_screen, 'game_widget') and hasattr(game_screen.game_widget, '_sounds'):
-                if game_screen.game_widget._sounds.bg:
-                    game_screen.game_widget._sounds.bg.stop()
+        get_audio().stop_music()
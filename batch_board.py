@@ -0,0 +1,160 @@
+# batch_board.py
+"""Vectorised engine holding N boards at once for bulk playouts.
+
+Requires NumPy (``pip install numpy``); the game itself does not.
+Cells are int8: 0 empty, 1 X, 2 O, 3 obstacle.
+"""
+from typing import List, Optional, Tuple
+
+import numpy as np
+
+from board import Board
+
+EMPTY, X, O, OBSTACLE = 0, 1, 2, 3
+_CODES = {Board.EMPTY: EMPTY, "X": X, "O": O, Board.OBSTACLE: OBSTACLE}
+
+
+class BatchBoard:
+    """N boards of the same shape stepped together.
+
+    ``cells`` is an (N, rows, cols) int8 array.  ``to_move`` holds the
+    code of the side to move per board, ``winner`` the winning code (0
+    while undecided) and ``done`` whether that board's game is over.
+    """
+
+    def __init__(self, n: int, rows: int, cols: int, win_len: int,
+                 num_obstacles: int = 0, seed: Optional[int] = None) -> None:
+        self.rows, self.cols, self.win_len = rows, cols, win_len
+        self.rng = np.random.default_rng(seed)
+        self.cells = np.zeros((n, rows, cols), dtype=np.int8)
+        if num_obstacles:
+            # independent obstacle layout per board: the k smallest of
+            # n × cells random keys, picked in one argpartition
+            keys = self.rng.random((n, rows * cols))
+            idx = np.argpartition(keys, num_obstacles - 1, axis=1)[:, :num_obstacles]
+            flat = self.cells.reshape(n, -1)
+            np.put_along_axis(flat, idx, OBSTACLE, axis=1)
+        self.to_move = np.full(n, X, dtype=np.int8)
+        self.winner = np.zeros(n, dtype=np.int8)
+        self.done = ~self.legal_mask().reshape(n, -1).any(axis=1)
+        self.plies = np.zeros(n, dtype=np.int32)
+
+    @classmethod
+    def from_boards(cls, boards: List[Board], to_move: str = "X",
+                    seed: Optional[int] = None) -> "BatchBoard":
+        """Stack existing positions (all with the same shape and win_len)."""
+        first = boards[0]
+        batch = cls(len(boards), first.rows, first.cols, first.win_len, seed=seed)
+        for n, board in enumerate(boards):
+            batch.cells[n] = [[_CODES[c] for c in row] for row in board.grid()]
+        batch.to_move[:] = _CODES[to_move]
+        batch.winner[:] = batch.winners()
+        batch.done = (batch.winner != 0) | ~batch.legal_mask().reshape(len(boards), -1).any(axis=1)
+        return batch
+
+    @classmethod
+    def from_seeds(cls, seeds: List[int], rows: int, cols: int, win_len: int,
+                   num_obstacles: int = 0, min_open_lines: int = 0) -> "BatchBoard":
+        """One board per seed, laid out exactly like ``Board(..., seed=s)``."""
+        return cls.from_boards([
+            Board(rows, cols, win_len, num_obstacles, seed=s, min_open_lines=min_open_lines)
+            for s in seeds
+        ])
+
+    def __len__(self) -> int:
+        return self.cells.shape[0]
+
+    # -------- queries -----------------------------------------------------
+
+    def legal_mask(self) -> np.ndarray:
+        return self.cells == EMPTY
+
+    def winners(self) -> np.ndarray:
+        """Winning code per board (0 if none), from full-board window sums."""
+        won_x = self._has_line(self.cells == X)
+        won_o = self._has_line(self.cells == O)
+        return np.where(won_x, X, np.where(won_o, O, EMPTY)).astype(np.int8)
+
+    def _has_line(self, stones: np.ndarray) -> np.ndarray:
+        """Per board: does *stones* contain a win-len run in any direction?
+
+        Each direction is a sliding-window sum built from win_len shifted
+        slices, so the whole batch is checked with O(win_len) array ops.
+        """
+        k, (n, rows, cols) = self.win_len, stones.shape
+        s = stones.astype(np.int8)
+        found = np.zeros(n, dtype=bool)
+        if cols >= k:      # horizontal
+            acc = sum(s[:, :, d:cols - k + 1 + d] for d in range(k))
+            found |= (acc == k).any(axis=(1, 2))
+        if rows >= k:      # vertical
+            acc = sum(s[:, d:rows - k + 1 + d, :] for d in range(k))
+            found |= (acc == k).any(axis=(1, 2))
+        if rows >= k and cols >= k:
+            # diagonal ↘ and anti-diagonal ↙
+            acc = sum(s[:, d:rows - k + 1 + d, d:cols - k + 1 + d] for d in range(k))
+            found |= (acc == k).any(axis=(1, 2))
+            acc = sum(s[:, d:rows - k + 1 + d, k - 1 - d:cols - d] for d in range(k))
+            found |= (acc == k).any(axis=(1, 2))
+        return found
+
+    # -------- stepping ----------------------------------------------------
+
+    def step(self, moves: np.ndarray) -> None:
+        """Play flat cell index ``moves[n]`` on every unfinished board n.
+
+        Entries for finished boards are ignored.  Only the boards that
+        moved are re-checked for a winner.
+        """
+        active = np.flatnonzero(~self.done)
+        if not active.size:
+            return
+        flat = self.cells.reshape(len(self), -1)
+        mv = moves[active]
+        if (flat[active, mv] != EMPTY).any():
+            raise ValueError("move on an occupied cell")
+        flat[active, mv] = self.to_move[active]
+        self.plies[active] += 1
+
+        sub = self.cells[active]
+        won = self._has_line(sub == self.to_move[active, None, None])
+        self.winner[active[won]] = self.to_move[active[won]]
+        full = ~(sub == EMPTY).reshape(active.size, -1).any(axis=1)
+        self.done[active] = won | full
+        self.to_move[active] = np.where(self.to_move[active] == X, O, X)
+
+    def random_moves(self) -> np.ndarray:
+        """One uniformly random legal cell per board (0 for finished ones)."""
+        legal = self.legal_mask().reshape(len(self), -1)
+        keys = np.where(legal, self.rng.random(legal.shape), -1.0)
+        return keys.argmax(axis=1)
+
+    def policy_moves(self, logits: np.ndarray) -> np.ndarray:
+        """Sample from per-cell *logits* (N, rows*cols), illegal cells masked."""
+        legal = self.legal_mask().reshape(len(self), -1)
+        # Gumbel-max trick: argmax(logits + Gumbel noise) ~ softmax(logits)
+        gumbel = -np.log(-np.log(self.rng.random(legal.shape)))
+        return np.where(legal, logits + gumbel, -np.inf).argmax(axis=1)
+
+    def playout(self, policy=None, max_plies: Optional[int] = None) -> np.ndarray:
+        """Play every board to the end and return the winner codes.
+
+        *policy*, if given, maps this BatchBoard to (N, rows*cols) logits.
+        """
+        limit = max_plies or self.rows * self.cols
+        for _ in range(limit):
+            if self.done.all():
+                break
+            moves = self.random_moves() if policy is None else self.policy_moves(policy(self))
+            self.step(moves)
+        return self.winner.copy()
+
+
+def random_playout_stats(n: int, rows: int, cols: int, win_len: int,
+                         num_obstacles: int = 0, seed: Optional[int] = None
+                         ) -> Tuple[float, float, float]:
+    """X win / O win / draw rates over *n* random games."""
+    batch = BatchBoard(n, rows, cols, win_len, num_obstacles, seed)
+    winners = batch.playout()
+    return (float((winners == X).mean()), float((winners == O).mean()),
+            float((winners == EMPTY).mean()))
@@ -0,0 +1,255 @@
+# benchmark.py
+"""Headless performance benchmarks for the board and AI hot paths.
+
+    python benchmark.py --out bench.json                 # run, write results
+    python benchmark.py --baseline bench_baseline.json   # run and compare
+    python benchmark.py --quick --save-baseline bench_baseline.json
+
+Every case uses fixed seeds, so runs are comparable.  The threat search,
+book and tablebase are off: the numbers measure the alpha-beta search.  With ``--baseline``
+the exit code is 1 if any metric got worse by more than ``--threshold``.
+"""
+import argparse
+import json
+import platform
+import random
+import statistics
+import sys
+import time
+from typing import Callable, Dict, List, Optional, Tuple
+
+from bitboard import BitBoard
+from board import Board
+from minimax import BUDGETS, MinimaxAI, SearchBudget
+from parallel_search import ParallelMinimaxAI, shutdown_pool
+
+SIZES = [(3, 3, 3), (5, 5, 4), (7, 7, 5), (9, 9, 5)]
+QUICK_SIZES = [(3, 3, 3), (5, 5, 4)]
+DENSITIES = [0.0, 0.1, 0.2]
+SEED = 12345
+
+# metric suffix -> True if a larger value is better
+_HIGHER_IS_BETTER = {"nodes_per_s": True, "us_per_op": False, "ms_per_move": False}
+# absolute differences below these are timer noise, never regressions
+_NOISE_FLOOR = {"nodes_per_s": 0.0, "us_per_op": 0.2, "ms_per_move": 1.0}
+# searches that finish in fewer nodes are too short for a stable rate
+MIN_SEARCH_NODES = 2_000
+
+
+def _timeit(fn: Callable[[], int], rounds: int = 11, round_time: float = 0.03) -> float:
+    """Microseconds per operation, median of *rounds*; *fn* returns its op count."""
+    samples = []
+    for _ in range(rounds):
+        ops, elapsed = 0, 0.0
+        start = time.perf_counter()
+        while elapsed < round_time:
+            ops += fn()
+            elapsed = time.perf_counter() - start
+        samples.append(elapsed / ops * 1e6)
+    return statistics.median(samples)
+
+
+def _median_of(fn: Callable[[], float], min_time: float = 0.3, min_runs: int = 5,
+               max_runs: int = 30) -> float:
+    """Median of repeated *fn* runs; fast cases repeat more to cut noise."""
+    samples: List[float] = []
+    start = time.perf_counter()
+    while len(samples) < max_runs and (
+        len(samples) < min_runs or time.perf_counter() - start < min_time
+    ):
+        samples.append(fn())
+    return statistics.median(samples)
+
+
+def _position(rows: int, cols: int, win_len: int, density: float,
+              plies: int) -> Tuple[object, List[Tuple[int, int]]]:
+    """Seeded board with *plies* random stones played, plus spare moves."""
+    obstacles = int(rows * cols * density)
+    board = Board(rows, cols, win_len, obstacles, seed=SEED)
+    rng = random.Random(SEED)
+    turn = "X"
+    for _ in range(plies):
+        moves = board.legal_moves()
+        if len(moves) < 2:
+            break
+        i, j = rng.choice(moves)
+        board.make_move(i, j, turn)
+        if board.winner:
+            board.unmake_move()
+            break
+        turn = "O" if turn == "X" else "X"
+    return board, board.legal_moves()
+
+
+def bench_win_check(board, moves) -> Dict[str, float]:
+    """make_move (with its incremental win check) + unmake, per engine."""
+    out = {}
+    for name, engine in (("board", board), ("bitboard", BitBoard.from_board(board))):
+        def run(engine=engine) -> int:
+            for i, j in moves:
+                engine.make_move(i, j, "X")
+                engine.has_winner("X")
+                engine.unmake_move()
+            return len(moves)
+        out[f"win_check.{name}.us_per_op"] = _timeit(run)
+    return out
+
+
+def bench_place(board, moves) -> Dict[str, float]:
+    def run() -> int:
+        for i, j in moves:
+            board.place(i, j, "O")
+        for _ in moves:
+            board.unmake_move()
+        return len(moves)
+    return {"place.us_per_op": _timeit(run)}
+
+
+def bench_search(board, nodes: int) -> Dict[str, float]:
+    searched = []
+
+    def run() -> float:
+        ai = MinimaxAI("hard", budget=SearchBudget(node_limit=nodes),
+                       use_book=False, use_tablebase=False, use_threats=False)
+        start = time.perf_counter()
+        ai.get_best_move(board, "X", "O")
+        searched.append(ai.nodes)
+        return (time.perf_counter() - start) / max(ai.nodes, 1)
+    rate = 1 / _median_of(run)
+    if min(searched) < MIN_SEARCH_NODES:
+        return {}     # solved almost at once: the rate would be noise
+    return {"search.nodes_per_s": rate}
+
+
+def bench_parallel(board, nodes: int, workers: List[int]) -> Dict[str, float]:
+    """Root-parallel throughput: every worker's nodes per wall-clock second.
+
+    Each worker searches its share of the root with the full node budget,
+    so near-linear scaling shows as nodes/s growing with the worker count.
+    """
+    warmup, _ = _position(5, 5, 4, 0.0, plies=2)
+    out = {}
+    for n in workers:
+        def run(n=n) -> float:
+            ai = ParallelMinimaxAI("hard", workers=n, budget=SearchBudget(node_limit=nodes),
+                                   use_book=False, use_tablebase=False, use_threats=False)
+            # workers outlive the search: a different setting clears their tables
+            ai.get_best_move(warmup, "X", "O")
+            start = time.perf_counter()
+            ai.get_best_move(board, "X", "O")
+            return (time.perf_counter() - start) / max(ai.nodes, 1)
+        out[f"parallel.w{n}.nodes_per_s"] = 1 / _median_of(run, min_runs=3)
+    shutdown_pool()
+    return out
+
+
+def bench_time_to_move(board, nodes: int) -> Dict[str, float]:
+    """Time per move for each difficulty's settings on a fixed node budget.
+
+    The shipped budgets are time-bound (hard always takes its 1.5 s), so
+    the wall-clock limit is dropped: a difficulty keeps its own node limit,
+    or gets *nodes* if it has none, and the metric tracks the work done.
+    """
+    out = {}
+    for difficulty, base in BUDGETS.items():
+        budget = SearchBudget(node_limit=base.node_limit or nodes, max_depth=base.max_depth)
+
+        def run(difficulty=difficulty, budget=budget) -> float:
+            random.seed(SEED)
+            ai = MinimaxAI(difficulty, budget=budget, use_book=False,
+                           use_tablebase=False, use_threats=False)
+            start = time.perf_counter()
+            ai.get_best_move(board, "X", "O")
+            return (time.perf_counter() - start) * 1e3
+        out[f"move.{difficulty}.ms_per_move"] = _median_of(run)
+    return out
+
+
+def run_suite(sizes, densities, nodes: int, workers: List[int]) -> Dict[str, float]:
+    results: Dict[str, float] = {}
+    for rows, cols, win_len in sizes:
+        for density in densities:
+            tag = f"{rows}x{cols}k{win_len}d{int(density * 100)}"
+            board, moves = _position(rows, cols, win_len, density, plies=min(4, rows * cols // 3))
+            if not moves:
+                continue
+            case: Dict[str, float] = {}
+            case.update(bench_win_check(board, moves))
+            case.update(bench_place(board, moves))
+            case.update(bench_search(board, nodes))
+            case.update(bench_time_to_move(board, nodes))
+            for metric, value in case.items():
+                results[f"{tag}.{metric}"] = round(value, 3)
+            print(f"{tag}: " + ", ".join(f"{k}={v:.1f}" for k, v in case.items()))
+    if workers:
+        # scaling is measured once, on the largest obstacle-free board
+        rows, cols, win_len = sizes[-1]
+        tag = f"{rows}x{cols}k{win_len}d0"
+        board, _ = _position(rows, cols, win_len, 0.0, plies=min(4, rows * cols // 3))
+        case = bench_parallel(board, nodes, workers)
+        for metric, value in case.items():
+            results[f"{tag}.{metric}"] = round(value, 3)
+        print(f"{tag}: " + ", ".join(f"{k}={v:.1f}" for k, v in case.items()))
+    return results
+
+
+def compare(results: Dict[str, float], baseline: Dict[str, float],
+            threshold: float) -> List[str]:
+    """Human-readable list of metrics that regressed past *threshold*."""
+    regressions = []
+    for metric, base in baseline.items():
+        new = results.get(metric)
+        if new is None or not base:
+            continue
+        unit = metric.rsplit(".", 1)[-1]
+        higher = _HIGHER_IS_BETTER[unit]
+        if abs(new - base) <= _NOISE_FLOOR[unit]:
+            continue
+        change = (new - base) / base
+        if (higher and change < -threshold) or (not higher and change > threshold):
+            regressions.append(f"{metric}: {base} -> {new} ({change:+.0%})")
+    return regressions
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    p = argparse.ArgumentParser(description="Board/AI performance benchmarks.")
+    p.add_argument("--quick", action="store_true", help="small board matrix only")
+    p.add_argument("--nodes", type=int, default=20_000, help="node budget for nodes/s")
+    p.add_argument("--workers", default="1,2,4",
+                   help="worker counts for the parallel search case ('' to skip)")
+    p.add_argument("--out", help="write results as JSON")
+    p.add_argument("--baseline", help="compare against this results file")
+    p.add_argument("--save-baseline", help="also store results as the new baseline")
+    p.add_argument("--threshold", type=float, default=0.15,
+                   help="allowed relative slowdown before failing")
+    args = p.parse_args(argv)
+
+    workers = [int(n) for n in args.workers.split(",") if n]
+    results = run_suite(QUICK_SIZES if args.quick else SIZES, DENSITIES, args.nodes, workers)
+    report = {
+        "meta": {
+            "python": platform.python_version(),
+            "machine": platform.machine(),
+            "seed": SEED,
+            "time": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        },
+        "results": results,
+    }
+    for path in (args.out, args.save_baseline):
+        if path:
+            with open(path, "w", encoding="utf-8") as f:
+                json.dump(report, f, indent=2, sort_keys=True)
+
+    if args.baseline:
+        with open(args.baseline, encoding="utf-8") as f:
+            baseline = json.load(f)["results"]
+        regressions = compare(results, baseline, args.threshold)
+        if regressions:
+            print("Regressions:\n  " + "\n  ".join(regressions))
+            return 1
+        print(f"No regressions beyond {args.threshold:.0%} against {args.baseline}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
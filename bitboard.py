@@ -0,0 +1,258 @@
+# bitboard.py
+from functools import lru_cache
+from typing import List, Optional, Tuple, Union
+
+from board import Board
+from zobrist import obstacle_key, zobrist_keys
+
+
+@lru_cache(maxsize=None)
+def win_masks(rows: int, cols: int, win_len: int) -> Tuple[Tuple[int, ...], Tuple[Tuple[int, ...], ...]]:
+    """Every win-len line as a bitmask, plus the lines through each cell.
+
+    Cell (i,j) is bit ``i * cols + j``.  Cached per board shape so the
+    masks are only built once per (rows, cols, win_len).
+    """
+    lines: List[int] = []
+    through: List[List[int]] = [[] for _ in range(rows * cols)]
+    for i in range(rows):
+        for j in range(cols):
+            for di, dj in Board.DIRECTIONS:
+                end_i = i + di * (win_len - 1)
+                end_j = j + dj * (win_len - 1)
+                if not (0 <= end_i < rows and 0 <= end_j < cols):
+                    continue
+                mask = 0
+                for k in range(win_len):
+                    mask |= 1 << ((i + di * k) * cols + (j + dj * k))
+                lines.append(mask)
+                for k in range(win_len):
+                    through[(i + di * k) * cols + (j + dj * k)].append(mask)
+    return tuple(lines), tuple(tuple(m) for m in through)
+
+
+class BitBoard:
+    """Search engine twin of :class:`Board` backed by one int per piece type.
+
+    Offers the same move API (make_move / unmake_move / legal_moves /
+    winner …) so MinimaxAI can search either representation.
+    """
+
+    EMPTY, OBSTACLE = Board.EMPTY, Board.OBSTACLE
+    X, O = "X", "O"
+
+    def __init__(self, rows: int, cols: int, win_len: int, obstacles: int = 0) -> None:
+        self._rows = rows
+        self._cols = cols
+        self._win_len = win_len
+        self._full = (1 << (rows * cols)) - 1
+        self._x = 0
+        self._o = 0
+        self._obstacles = obstacles
+        self._empty = self._full & ~obstacles
+        # Lines crossing an obstacle can never be won – drop them up front.
+        lines, through = win_masks(rows, cols, win_len)
+        self._lines = tuple(m for m in lines if not m & obstacles)
+        self._through = tuple(
+            tuple(m for m in cell if not m & obstacles) for cell in through
+        )
+        self._live = len(self._lines)   # open lines not holding both sides
+        # (cell, symbol, winner before, lines the move killed)
+        self._moves: List[Tuple[int, str, Optional[str], int]] = []
+        self._winner: Optional[str] = None
+        self._keys = zobrist_keys(rows, cols)
+        self._hash = obstacle_key(rows, cols, _bit_indices(obstacles))
+
+    # -------- conversion --------------------------------------------------
+
+    @classmethod
+    def from_masks(cls, rows: int, cols: int, win_len: int,
+                   x: int, o: int, obstacles: int = 0) -> "BitBoard":
+        """Build a position from raw piece masks (winner and key recomputed)."""
+        bb = cls(rows, cols, win_len, obstacles)
+        bb._x, bb._o = x, o
+        bb._empty &= ~(x | o)
+        for idx in _bit_indices(x):
+            bb._hash ^= bb._keys[cls.X][idx]
+        for idx in _bit_indices(o):
+            bb._hash ^= bb._keys[cls.O][idx]
+        lines, _ = win_masks(rows, cols, win_len)
+        for mask in lines:
+            if x & mask == mask:
+                bb._winner = cls.X
+            elif o & mask == mask:
+                bb._winner = cls.O
+        bb._count_live()
+        return bb
+
+    @classmethod
+    def from_board(cls, board: Board) -> "BitBoard":
+        rows, cols = board.rows, board.cols
+        obstacles = x = o = 0
+        for i in range(rows):
+            for j in range(cols):
+                bit = 1 << (i * cols + j)
+                sym = board.get(i, j)
+                if sym == cls.OBSTACLE:
+                    obstacles |= bit
+                elif sym == cls.X:
+                    x |= bit
+                elif sym == cls.O:
+                    o |= bit
+        bb = cls(rows, cols, board.win_len, obstacles)
+        bb._x, bb._o = x, o
+        bb._empty &= ~(x | o)
+        bb._winner = board.winner
+        bb._hash = board.hash_key
+        bb._count_live()
+        return bb
+
+    def to_board(self) -> Board:
+        return Board.from_grid(self.grid(), self._win_len)
+
+    # -------- public API --------------------------------------------------
+
+    @property
+    def rows(self) -> int: return self._rows
+
+    @property
+    def cols(self) -> int: return self._cols
+
+    @property
+    def win_len(self) -> int: return self._win_len
+
+    @property
+    def winner(self) -> Optional[str]:
+        return self._winner
+
+    @property
+    def last_move(self) -> Optional[Tuple[int, int]]:
+        return divmod(self._moves[-1][0], self._cols) if self._moves else None
+
+    @property
+    def move_count(self) -> int:
+        """Number of moves on the move stack."""
+        return len(self._moves)
+
+    @property
+    def hash_key(self) -> int:
+        return self._hash
+
+    @property
+    def legal_mask(self) -> int:
+        return self._empty
+
+    @property
+    def open_lines(self) -> Tuple[int, ...]:
+        """Masks of the win lines no obstacle blocks."""
+        return self._lines
+
+    def bits(self, symbol: str) -> int:
+        if symbol == self.X:
+            return self._x
+        if symbol == self.O:
+            return self._o
+        return self._obstacles
+
+    def get(self, i: int, j: int) -> str:
+        bit = 1 << (i * self._cols + j)
+        if self._x & bit:
+            return self.X
+        if self._o & bit:
+            return self.O
+        if self._obstacles & bit:
+            return self.OBSTACLE
+        return self.EMPTY
+
+    def grid(self) -> List[List[str]]:
+        return [[self.get(i, j) for j in range(self._cols)] for i in range(self._rows)]
+
+    def is_empty(self, i: int, j: int) -> bool:
+        return bool(self._empty >> (i * self._cols + j) & 1)
+
+    def is_obstacle(self, i: int, j: int) -> bool:
+        return bool(self._obstacles >> (i * self._cols + j) & 1)
+
+    def is_full(self) -> bool:
+        return not self._empty
+
+    def has_winner(self, symbol: str) -> bool:
+        return self._winner == symbol
+
+    @property
+    def live_lines(self) -> int:
+        """Open lines that hold stones of at most one side."""
+        return self._live
+
+    def is_dead_draw(self) -> bool:
+        """True once neither side can complete any line (a full board too)."""
+        return not self._live and self._winner is None
+
+    def place(self, i: int, j: int, symbol: str) -> bool:
+        if self.is_empty(i, j):
+            self.make_move(i, j, symbol)
+            return True
+        return False
+
+    def make_move(self, i: int, j: int, symbol: str) -> None:
+        idx = i * self._cols + j
+        bit = 1 << idx
+        self._empty ^= bit
+        if symbol == self.X:
+            before, other = self._x, self._o
+            self._x = mine = before | bit
+        else:
+            before, other = self._o, self._x
+            self._o = mine = before | bit
+        prev = self._winner
+        check, killed = prev is None, 0
+        for mask in self._through[idx]:
+            if mask & other:
+                if not mask & before:
+                    killed += 1          # line now holds both sides
+            elif check and mine & mask == mask:
+                self._winner = symbol
+                check = False
+        self._live -= killed
+        self._moves.append((idx, symbol, prev, killed))
+        self._hash ^= self._keys[symbol][idx]
+
+    def unmake_move(self) -> Tuple[int, int]:
+        idx, symbol, winner, killed = self._moves.pop()
+        self._live += killed
+        self._hash ^= self._keys[symbol][idx]
+        bit = 1 << idx
+        self._empty |= bit
+        if symbol == self.X:
+            self._x &= ~bit
+        else:
+            self._o &= ~bit
+        self._winner = winner
+        return divmod(idx, self._cols)
+
+    def _count_live(self) -> None:
+        x, o = self._x, self._o
+        self._live = sum(1 for m in self._lines if not (m & x and m & o))
+
+    def stones(self) -> List[Tuple[int, int]]:
+        cols = self._cols
+        return [divmod(idx, cols) for idx in _bit_indices(self._x | self._o)]
+
+    def legal_moves(self) -> List[Tuple[int, int]]:
+        """Empty cells in row-major order (same order as Board)."""
+        cols = self._cols
+        return [divmod(idx, cols) for idx in _bit_indices(self._empty)]
+
+
+def _bit_indices(mask: int) -> List[int]:
+    """Indices of the set bits of *mask*, lowest first."""
+    out = []
+    while mask:
+        low = mask & -mask
+        out.append(low.bit_length() - 1)
+        mask ^= low
+    return out
+
+
+# Either representation can be searched by MinimaxAI.
+Engine = Union[Board, BitBoard]
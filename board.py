@@ -1,10 +1,72 @@
 import random
-from typing import List, Tuple
+import sys
+from functools import lru_cache
+from typing import List, Optional, Tuple
+
+from zobrist import obstacle_key, zobrist_keys
+
+MAX_LAYOUT_TRIES = 1000
+# one move-stack entry: ((i, j), symbol, winner) plus its list slot
+_MOVE_BYTES = sys.getsizeof((None, None, None)) + sys.getsizeof((0, 0)) + 8
+
+
+@lru_cache(maxsize=None)
+def win_lines(rows: int, cols: int, win_len: int) -> Tuple[Tuple[int, ...], ...]:
+    """Cell indices (i * cols + j) of every win-len window on the board."""
+    lines = []
+    for i in range(rows):
+        for j in range(cols):
+            for di, dj in Board.DIRECTIONS:
+                ei, ej = i + di * (win_len - 1), j + dj * (win_len - 1)
+                if 0 <= ei < rows and 0 <= ej < cols:
+                    lines.append(tuple(
+                        (i + di * k) * cols + j + dj * k for k in range(win_len)
+                    ))
+    return tuple(lines)
+
+
+def obstacle_layout(rows: int, cols: int, win_len: int, num_obstacles: int,
+                    rng: random.Random, min_open_lines: int = 0) -> List[int]:
+    """Obstacle cell indices drawn straight from the cell set, O(k) per try.
+
+    Layouts leaving fewer than *min_open_lines* obstacle-free win lines
+    are redrawn from the same *rng*, so a seed still fixes the result.
+    """
+    if not 0 <= num_obstacles <= rows * cols:
+        raise ValueError(f"{num_obstacles} obstacles do not fit on {rows}x{cols}")
+    lines = win_lines(rows, cols, win_len) if min_open_lines else ()
+    if min_open_lines > len(lines):
+        raise ValueError(f"{rows}x{cols} has only {len(lines)} lines of {win_len}")
+    for _ in range(MAX_LAYOUT_TRIES):
+        cells = rng.sample(range(rows * cols), num_obstacles)
+        if not min_open_lines:
+            return cells
+        blocked = set(cells)
+        open_lines = sum(1 for line in lines if blocked.isdisjoint(line))
+        if open_lines >= min_open_lines:
+            return cells
+    raise ValueError(
+        f"no layout of {num_obstacles} obstacles leaves {min_open_lines} open lines"
+    )
+
+
+def _deep_sizeof(obj, seen: set) -> int:
+    if id(obj) in seen:
+        return 0
+    seen.add(id(obj))
+    size = sys.getsizeof(obj)
+    if isinstance(obj, (list, tuple, set, frozenset)):
+        size += sum(_deep_sizeof(item, seen) for item in obj)
+    elif isinstance(obj, dict):
+        size += sum(_deep_sizeof(k, seen) + _deep_sizeof(v, seen) for k, v in obj.items())
+    return size
+
 
 class Board:
     """Game model: holds state and enforces the rules."""
 
     EMPTY, OBSTACLE = ".", "#"
+    DIRECTIONS = ((1, 0), (0, 1), (1, 1), (1, -1))
 
     def __init__(
         self,
@@ -12,13 +74,59 @@ class Board:
         cols: int = 5,
         win_len: int = 4,
         num_obstacles: int = 5,
+        seed: Optional[int] = None,
+        min_open_lines: int = 0,
     ) -> None:
+        """*seed* fixes the obstacle layouts: the first one and every reset().
+
+        *min_open_lines* rejects layouts that leave fewer obstacle-free
+        win lines; impossible settings raise ValueError.
+        """
         self._rows = rows
         self._cols = cols
         self._win_len = win_len
         self._num_obstacles = num_obstacles
+        self._min_open_lines = min_open_lines
+        self._rng = random.Random(seed)
         self.reset()
 
+    @classmethod
+    def from_grid(cls, grid: List[List[str]], win_len: int = 4) -> "Board":
+        """Build a board holding exactly *grid* (no random obstacles)."""
+        rows, cols = len(grid), len(grid[0])
+        board = cls(rows, cols, win_len, num_obstacles=0)
+        board._num_obstacles = sum(row.count(cls.OBSTACLE) for row in grid)
+        board._grid = [list(row) for row in grid]
+        board._legal = {
+            (i, j)
+            for i in range(rows)
+            for j in range(cols)
+            if board._grid[i][j] == cls.EMPTY
+        }
+        board._hash = 0
+        board._index_lines()
+        for i in range(rows):
+            for j in range(cols):
+                sym = board._grid[i][j]
+                if sym != cls.EMPTY:
+                    board._hash ^= board._keys[sym][i * cols + j]
+                if sym in ("X", "O"):
+                    board._count_stone(i * cols + j, sym)
+                    if board._wins_through(i, j, sym):
+                        board._winner = sym
+        return board
+
+    def copy(self) -> "Board":
+        """Independent snapshot, move stack included."""
+        clone = self.__class__.__new__(self.__class__)
+        clone.__dict__.update(self.__dict__)
+        clone._grid = [list(row) for row in self._grid]
+        clone._legal = set(self._legal)
+        clone._moves = list(self._moves)
+        clone._line_x = list(self._line_x)
+        clone._line_o = list(self._line_o)
+        return clone
+
     # -------- public API --------------------------------------------------
 
     @property
@@ -27,6 +135,28 @@ class Board:
     @property
     def cols(self) -> int: return self._cols
 
+    @property
+    def win_len(self) -> int: return self._win_len
+
+    @property
+    def winner(self) -> Optional[str]:
+        """Symbol that completed a line, or None while nobody has."""
+        return self._winner
+
+    @property
+    def last_move(self) -> Optional[Tuple[int, int]]:
+        return self._moves[-1][0] if self._moves else None
+
+    @property
+    def move_count(self) -> int:
+        """Number of moves on the move stack."""
+        return len(self._moves)
+
+    @property
+    def hash_key(self) -> int:
+        """Zobrist key of the position, obstacles included."""
+        return self._hash
+
     def reset(self) -> None:
         """Clear the board and randomly place fresh obstacles."""
         self._grid: List[List[str]] = [
@@ -39,6 +169,18 @@ class Board:
             for j in range(self._cols)
             if self._grid[i][j] == self.EMPTY
         }
+        # (coords, symbol, winner before the move) – undone by unmake_move
+        self._moves: List[Tuple[Tuple[int, int], str, Optional[str]]] = []
+        self._winner: Optional[str] = None
+        self._keys = zobrist_keys(self._rows, self._cols)
+        self._hash = obstacle_key(
+            self._rows, self._cols,
+            (i * self._cols + j
+             for i in range(self._rows)
+             for j in range(self._cols)
+             if self._grid[i][j] == self.OBSTACLE),
+        )
+        self._index_lines()
 
     def is_empty(self, i: int, j: int) -> bool:
         return (i, j) in self._legal
@@ -46,45 +188,145 @@ class Board:
     def is_obstacle(self, i: int, j: int) -> bool:
         return self._grid[i][j] == self.OBSTACLE
 
+    def get(self, i: int, j: int) -> str:
+        return self._grid[i][j]
+
+    def grid(self) -> List[List[str]]:
+        """Copy of the cell contents, row by row."""
+        return [list(row) for row in self._grid]
+
     def place(self, i: int, j: int, symbol: str) -> bool:
         """Attempt to place *symbol* at (i,j).  Return True on success."""
         if self.is_empty(i, j):
-            self._grid[i][j] = symbol
-            self._legal.remove((i, j))
+            self.make_move(i, j, symbol)
             return True
         return False
 
+    def make_move(self, i: int, j: int, symbol: str) -> None:
+        """Play *symbol* at the empty cell (i,j) and push it on the move stack.
+
+        Only the lines through (i,j) are inspected to update the winner,
+        so this costs O(win_len) instead of a full board scan.
+        """
+        self._grid[i][j] = symbol
+        self._legal.remove((i, j))
+        self._moves.append(((i, j), symbol, self._winner))
+        self._hash ^= self._keys[symbol][i * self._cols + j]
+        self._count_stone(i * self._cols + j, symbol)
+        if self._winner is None and self._wins_through(i, j, symbol):
+            self._winner = symbol
+
+    def unmake_move(self) -> Tuple[int, int]:
+        """Take back the most recent move and return its coordinates."""
+        (i, j), symbol, winner = self._moves.pop()
+        self._hash ^= self._keys[symbol][i * self._cols + j]
+        self._uncount_stone(i * self._cols + j, symbol)
+        self._grid[i][j] = self.EMPTY
+        self._legal.add((i, j))
+        self._winner = winner
+        return i, j
+
+    def legal_moves(self) -> List[Tuple[int, int]]:
+        """Empty cells in row-major order."""
+        return sorted(self._legal)
+
+    def stones(self) -> List[Tuple[int, int]]:
+        """Cells holding an X or an O."""
+        return [
+            (i, j)
+            for i in range(self._rows)
+            for j in range(self._cols)
+            if self._grid[i][j] not in (self.EMPTY, self.OBSTACLE)
+        ]
+
     def is_full(self) -> bool:
         return not self._legal
 
+    @property
+    def footprint(self) -> int:
+        """Approximate bytes held by this board alone.
+
+        Shared per-shape caches (zobrist keys, win-line tuples) are left
+        out.  Everything but the move stack is fixed for a layout, so it
+        is measured once and each move on the stack adds a constant.
+        """
+        if self._base_bytes is None:
+            skip = {id(self._keys), id(self._moves)}
+            skip.update(id(line) for line in self._lines)
+            self._base_bytes = _deep_sizeof(self.__dict__, skip) + sys.getsizeof(self)
+        return self._base_bytes + sys.getsizeof(self._moves) + len(self._moves) * _MOVE_BYTES
+
+    @property
+    def live_lines(self) -> int:
+        """Open lines that hold stones of at most one side."""
+        return self._live
+
+    def is_dead_draw(self) -> bool:
+        """True once neither side can complete any line (a full board too)."""
+        return not self._live and self._winner is None
+
     def has_winner(self, symbol: str) -> bool:
-        """Check every direction for a win-len line of *symbol*."""
-        directions = [(1, 0), (0, 1), (1, 1), (1, -1)]
-        for i in range(self._rows):
-            for j in range(self._cols):
-                if self._grid[i][j] != symbol:
-                    continue
-                for di, dj in directions:
-                    count, x, y = 1, i + di, j + dj
-                    while (
-                        0 <= x < self._rows
-                        and 0 <= y < self._cols
-                        and self._grid[x][y] == symbol
-                    ):
-                        count += 1
-                        if count >= self._win_len:
-                            return True
-                        x += di
-                        y += dj
-        return False
+        """True if *symbol* has completed a win-len line."""
+        return self._winner == symbol
 
     # -------- internal helpers --------------------------------------------
 
+    def _wins_through(self, i: int, j: int, symbol: str) -> bool:
+        """Check the four lines through (i,j) for a win-len run of *symbol*."""
+        grid, rows, cols = self._grid, self._rows, self._cols
+        for di, dj in self.DIRECTIONS:
+            count = 1
+            x, y = i + di, j + dj
+            while 0 <= x < rows and 0 <= y < cols and grid[x][y] == symbol:
+                count += 1
+                x += di
+                y += dj
+            x, y = i - di, j - dj
+            while 0 <= x < rows and 0 <= y < cols and grid[x][y] == symbol:
+                count += 1
+                x -= di
+                y -= dj
+            if count >= self._win_len:
+                return True
+        return False
+
+    def _index_lines(self) -> None:
+        """Index the win lines no obstacle blocks, with per-line counters.
+
+        ``_cell_lines[idx]`` lists the lines through cell *idx*;
+        ``_line_x`` / ``_line_o`` count each side's stones per line and
+        ``_live`` counts lines not yet holding both sides.
+        """
+        cols, grid = self._cols, self._grid
+        self._lines = tuple(
+            line for line in win_lines(self._rows, cols, self._win_len)
+            if all(grid[c // cols][c % cols] != self.OBSTACLE for c in line)
+        )
+        cell_lines: List[List[int]] = [[] for _ in range(self._rows * cols)]
+        for n, line in enumerate(self._lines):
+            for c in line:
+                cell_lines[c].append(n)
+        self._cell_lines = tuple(tuple(ns) for ns in cell_lines)
+        self._line_x = [0] * len(self._lines)
+        self._line_o = [0] * len(self._lines)
+        self._live = len(self._lines)
+        self._base_bytes: Optional[int] = None     # see footprint
+
+    def _count_stone(self, idx: int, symbol: str) -> None:
+        own, other = (self._line_x, self._line_o) if symbol == "X" else (self._line_o, self._line_x)
+        for n in self._cell_lines[idx]:
+            if not own[n] and other[n]:
+                self._live -= 1            # first stone of ours: line is dead
+            own[n] += 1
+
+    def _uncount_stone(self, idx: int, symbol: str) -> None:
+        own, other = (self._line_x, self._line_o) if symbol == "X" else (self._line_o, self._line_x)
+        for n in self._cell_lines[idx]:
+            own[n] -= 1
+            if not own[n] and other[n]:
+                self._live += 1
+
     def _place_obstacles(self) -> None:
-        placed = 0
-        while placed < self._num_obstacles:
-            i = random.randrange(self._rows)
-            j = random.randrange(self._cols)
-            if self._grid[i][j] == self.EMPTY:
-                self._grid[i][j] = self.OBSTACLE
-                placed += 1
+        for idx in obstacle_layout(self._rows, self._cols, self._win_len,
+                                   self._num_obstacles, self._rng, self._min_open_lines):
+            self._grid[idx // self._cols][idx % self._cols] = self.OBSTACLE
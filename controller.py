@@ -1,10 +1,17 @@
 # controller.py
+import logging
+import random
+import threading
 from enum import Enum, auto
 from typing import List, Tuple, Protocol, Optional
-from kivy.clock import Clock
 
 from board import Board
 from minimax import MinimaxAI
+from mcts import MCTSAI
+from scheduler import KivyScheduler, Scheduler
+from search_stats import SearchStats
+
+logger = logging.getLogger("tictactoe.controller")
 
 
 class GameState(Enum):
@@ -22,25 +29,50 @@ class GameObserver(Protocol):
         self, state: GameState, next_turn: Optional[str]
     ) -> None: ...
 
+    # Optional: observers that also define
+    #     on_search_stats(self, stats: SearchStats) -> None
+    # receive the statistics of every bot move.
+
+
+def create_ai(difficulty: str):
+    """Bot for a difficulty: "mcts" or one of the MinimaxAI budgets."""
+    if difficulty == "mcts":
+        return MCTSAI()
+    return MinimaxAI(difficulty)
+
 
 class GameController:
     """Link between UI and model; enforces turn flow."""
 
-    def __init__(self, board: Board, mode: str = "friend", difficulty: str = "medium") -> None:
+    def __init__(self, board: Board, mode: str = "friend", difficulty: str = "medium",
+                 scheduler: Optional[Scheduler] = None, ai_delay: float = 0.5) -> None:
         self._board = board
+        # kivy's Clock unless told otherwise; headless code passes its own
+        self._scheduler = scheduler or KivyScheduler()
+        self._ai_delay = ai_delay
         self._current = "X"
         self._state = GameState.IN_PROGRESS
         self._observers: List[GameObserver] = []
+        self._ai = None
+        self._human_symbol = "X"
+        self._ai_symbol = "O"
+        self._set_mode(mode, difficulty)
+
+        # Bumped on every cancel so results of abandoned searches are dropped.
+        self._ai_job = 0
+        self._ai_event = None
+        # Cancel token of the running search; made here, never reused.
+        self._ai_cancel: Optional[threading.Event] = None
+
+    def _set_mode(self, mode: str, difficulty: str) -> None:
+        # Initialize AI if playing against bot; an unchanged bot is kept,
+        # together with its transposition table / search tree.
+        if mode != "bot":
+            self._ai = None
+        elif self._ai is None or difficulty != self._difficulty:
+            self._ai = create_ai(difficulty)
         self._mode = mode
         self._difficulty = difficulty
-        
-        # Initialize AI if playing against bot
-        if mode == "bot":
-            self._ai = MinimaxAI(difficulty)
-            self._human_symbol = "X"
-            self._ai_symbol = "O"
-        else:
-            self._ai = None
 
     # -------- observer glue -----------------------------------------------
 
@@ -53,6 +85,14 @@ class GameController:
         for obs in self._observers:
             obs.on_board_change(coords, symbol)
 
+    def _notify_stats(self, stats: Optional[SearchStats]) -> None:
+        if stats is None:
+            return
+        for obs in self._observers:
+            cb = getattr(obs, "on_search_stats", None)
+            if cb is not None:
+                cb(stats)
+
     def _notify_state(self) -> None:
         nxt = None if self._state is not GameState.IN_PROGRESS else self._current
         for obs in self._observers:
@@ -84,21 +124,44 @@ class GameController:
             
             # If it's bot's turn, schedule AI move
             if self._mode == "bot" and self._current == self._ai_symbol and self._state == GameState.IN_PROGRESS:
-                Clock.schedule_once(self._make_ai_move, 0.5)
+                self._ai_event = self._scheduler.schedule(self._ai_delay, self._make_ai_move)
 
         self._notify_state()
     
-    def _make_ai_move(self, dt):
-        """Make AI move after a short delay."""
+    def _make_ai_move(self) -> None:
+        """Start the AI search in the background after a short delay."""
+        self._ai_event = None
         if self._state != GameState.IN_PROGRESS:
             return
-            
-        move = self._ai.get_best_move(self._board, self._ai_symbol, self._human_symbol)
+
+        job = self._ai_job
+        # Search a snapshot so the UI thread never sees half-made moves.
+        snapshot = self._board.copy()
+        ai, token = self._ai, threading.Event()
+        self._ai_cancel = token
+        self._scheduler.submit(
+            lambda: self._think(ai, snapshot, token),
+            lambda result: self._apply_ai_move(job, *result),
+            lambda exc: self._ai_failed(job, exc),
+        )
+
+    def _think(self, ai, snapshot: Board, token: threading.Event
+               ) -> Tuple[Optional[Tuple[int, int]], Optional[SearchStats]]:
+        """Background: search and return the move with its statistics."""
+        move = ai.get_best_move(snapshot, self._ai_symbol, self._human_symbol, cancel=token)
+        return move, ai.last_stats
+
+    def _apply_ai_move(self, job: int, move: Optional[Tuple[int, int]],
+                       stats: Optional[SearchStats] = None) -> None:
+        """Main loop: play the AI move unless it was cancelled meanwhile."""
+        if job != self._ai_job or self._state != GameState.IN_PROGRESS:
+            return  # stale result for a board that has been reset
+        self._notify_stats(stats)
         if move:
             # Make the move directly on the board
             if self._board.place(move[0], move[1], self._ai_symbol):
                 self._notify_board((move[0], move[1]), self._ai_symbol)
-                
+
                 # Check win/draw conditions
                 if self._board.has_winner(self._ai_symbol):
                     self._state = GameState.O_WON
@@ -107,13 +170,40 @@ class GameController:
                 else:
                     # Switch back to human turn
                     self._current = self._human_symbol
-                
+
                 self._notify_state()
 
+    def _ai_failed(self, job: int, exc: BaseException) -> None:
+        """Main loop: the search raised; play a random move so the game goes on."""
+        if job != self._ai_job or self._state != GameState.IN_PROGRESS:
+            return
+        logger.error("AI search failed, playing a random move", exc_info=exc)
+        moves = self._board.legal_moves()
+        self._apply_ai_move(job, random.choice(moves) if moves else None)
+
+    def cancel_ai(self) -> None:
+        """Drop any pending or running AI move (restart, leaving the game)."""
+        self._ai_job += 1
+        if self._ai_event is not None:
+            self._ai_event.cancel()
+            self._ai_event = None
+        if self._ai_cancel is not None:
+            self._ai_cancel.set()       # works even if the search has not started
+            self._ai_cancel = None
+
     def getBoard(self) -> Board:
         return self._board
     
+    def reconfigure(self, mode: str, difficulty: str, board: Optional[Board] = None) -> None:
+        """Start a new game in place: new mode, difficulty and/or board."""
+        self.cancel_ai()
+        self._set_mode(mode, difficulty)
+        if board is not None:
+            self._board = board
+        self.reset()
+
     def reset(self) -> None:
+        self.cancel_ai()
         self._board.reset()
         self._current = "X"
         self._state = GameState.IN_PROGRESS
@@ -0,0 +1,114 @@
+# evaluation.py
+from typing import List, Tuple
+
+from board import win_lines
+
+# Upper bound on |LineEvaluator.score|; search win scores sit well above it.
+EVAL_LIMIT = 100_000
+
+
+def line_weights(win_len: int) -> List[int]:
+    """Value of an open line holding k stones of one side, for k = 0..win_len.
+
+    Up to a direct threat each extra stone is worth four times the
+    previous one, and the threat (one stone short) gets another factor
+    four.  A completed line outweighs what any non-winning move can gain
+    on all the lines through its cell, for either side, so ordering by
+    ``move_gain`` puts an immediate win above every block.
+    """
+    weights = [0] + [4 ** (k - 1) for k in range(1, win_len + 1)]
+    if win_len >= 2:
+        weights[win_len - 1] *= 4
+        # a cell lies on at most 4 * win_len lines
+        weights[win_len] = 16 * win_len * weights[win_len - 1]
+    return weights
+
+
+class LineEvaluator:
+    """Static evaluation from open win-len lines, kept up to date per move.
+
+    Every win-len window without an obstacle is a line.  A line holding
+    stones of only one side is worth ``line_weights`` for that side; a line
+    holding both is dead and worth nothing.  ``apply`` / ``revert`` only
+    touch the lines through the played cell, so ``score`` is O(1) to read.
+    """
+
+    def __init__(self, board) -> None:
+        rows, cols, win_len = board.rows, board.cols, board.win_len
+        self._cols = cols
+        lines: List[Tuple[int, ...]] = [
+            cells for cells in win_lines(rows, cols, win_len)
+            if not any(board.is_obstacle(*divmod(c, cols)) for c in cells)
+        ]
+
+        self._cell_lines: List[List[int]] = [[] for _ in range(rows * cols)]
+        for n, cells in enumerate(lines):
+            for c in cells:
+                self._cell_lines[c].append(n)
+
+        # _value[x][o]: contribution of a line with x X-stones and o O-stones
+        w = line_weights(win_len)
+        self._value = [
+            [w[x] if not o else (-w[o] if not x else 0) for o in range(win_len + 1)]
+            for x in range(win_len + 1)
+        ]
+        self._x = [0] * len(lines)
+        self._o = [0] * len(lines)
+        self.score = 0  # X's point of view
+
+        for i in range(rows):
+            for j in range(cols):
+                sym = board.get(i, j)
+                if sym in ("X", "O"):
+                    self.apply(i, j, sym)
+
+    def apply(self, i: int, j: int, symbol: str) -> None:
+        """Account for *symbol* being played at (i,j)."""
+        value, xs, os_ = self._value, self._x, self._o
+        delta = 0
+        if symbol == "X":
+            for n in self._cell_lines[i * self._cols + j]:
+                x, o = xs[n], os_[n]
+                delta += value[x + 1][o] - value[x][o]
+                xs[n] = x + 1
+        else:
+            for n in self._cell_lines[i * self._cols + j]:
+                x, o = xs[n], os_[n]
+                delta += value[x][o + 1] - value[x][o]
+                os_[n] = o + 1
+        self.score += delta
+
+    def revert(self, i: int, j: int, symbol: str) -> None:
+        """Undo a previous ``apply`` of the same move."""
+        value, xs, os_ = self._value, self._x, self._o
+        delta = 0
+        if symbol == "X":
+            for n in self._cell_lines[i * self._cols + j]:
+                x, o = xs[n], os_[n]
+                delta += value[x - 1][o] - value[x][o]
+                xs[n] = x - 1
+        else:
+            for n in self._cell_lines[i * self._cols + j]:
+                x, o = xs[n], os_[n]
+                delta += value[x][o - 1] - value[x][o]
+                os_[n] = o - 1
+        self.score += delta
+
+    def move_gain(self, i: int, j: int, symbol: str) -> int:
+        """How much playing (i,j) would improve *symbol*'s line score."""
+        value, xs, os_ = self._value, self._x, self._o
+        gain = 0
+        if symbol == "X":
+            for n in self._cell_lines[i * self._cols + j]:
+                x, o = xs[n], os_[n]
+                gain += value[x + 1][o] - value[x][o]
+            return gain
+        for n in self._cell_lines[i * self._cols + j]:
+            x, o = xs[n], os_[n]
+            gain += value[x][o] - value[x][o + 1]
+        return gain
+
+    def evaluate(self, symbol: str) -> float:
+        """Score from *symbol*'s point of view, clamped to ±EVAL_LIMIT."""
+        score = self.score if symbol == "X" else -self.score
+        return max(-EVAL_LIMIT, min(EVAL_LIMIT, score))
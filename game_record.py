@@ -0,0 +1,328 @@
+# game_record.py
+"""Compact binary game records: streamed while playing, replayed by ply.
+
+Record every game a controller plays::
+
+    writer = GameWriter("games.ttr", append=True)
+    GameRecorder(writer, controller)
+    ...
+    writer.close()
+
+and look at them offline::
+
+    python game_record.py games.ttr                    # summary
+    python game_record.py games.ttr --game 12 --ply 7  # one position
+
+A file is a 5-byte header, one block per game and, once the writer is
+closed, an index of block offsets (u64) followed by a trailer pointing
+at it.  Every field of a block is a LEB128 varint: rows, cols, win_len,
+result, plies, the obstacle mask (bit ``i * cols + j``; 0 without
+obstacles) and then one cell index per move.  X always moves first, so
+colours are implied and a game on a board up to 128 cells costs one
+byte per move plus about six bytes (obstacle masks add cells/7 bytes).
+
+Readers memory-map the file and reach game *n* through the index in
+O(1); a position only decodes the moves before the requested ply.
+A file whose writer died before writing the index is rescanned, and
+``append=True`` resumes it, so collection can run across sessions.
+"""
+import argparse
+import mmap
+import os
+import struct
+import sys
+from array import array
+from typing import Iterable, Iterator, List, Optional, Sequence, Tuple
+
+from board import Board
+from controller import GameController, GameState
+
+Move = Tuple[int, int]
+
+UNFINISHED, X_WON, O_WON, DRAW = 0, 1, 2, 3
+RESULT_NAMES = {UNFINISHED: "unfinished", X_WON: "X", O_WON: "O", DRAW: "draw"}
+_RESULTS = {GameState.X_WON: X_WON, GameState.O_WON: O_WON, GameState.DRAW: DRAW}
+
+_MAGIC = b"TTTR"
+_HEADER = struct.Struct("<4sB")       # magic, version
+_TRAILER = struct.Struct("<QQ4s")     # index offset, game count, magic
+_VERSION = 1
+
+
+# -------- encoding ----------------------------------------------------------
+
+def _put_varint(out: bytearray, value: int) -> None:
+    while value >= 0x80:
+        out.append(value & 0x7F | 0x80)
+        value >>= 7
+    out.append(value)
+
+
+def _get_varint(buf, pos: int) -> Tuple[int, int]:
+    """(value, position after it); IndexError if *buf* ends inside it."""
+    value = shift = 0
+    while True:
+        byte = buf[pos]
+        pos += 1
+        value |= (byte & 0x7F) << shift
+        if byte < 0x80:
+            return value, pos
+        shift += 7
+
+
+def obstacle_cells(board: Board) -> List[int]:
+    """Cell indices (``i * cols + j``) of *board*'s obstacles."""
+    cols = board.cols
+    return [
+        i * cols + j
+        for i in range(board.rows)
+        for j in range(cols)
+        if board.is_obstacle(i, j)
+    ]
+
+
+def encode_game(rows: int, cols: int, win_len: int, obstacles: Iterable[int],
+                moves: Sequence[Move], result: int) -> bytes:
+    mask = 0
+    for idx in obstacles:
+        mask |= 1 << idx
+    out = bytearray()
+    for value in (rows, cols, win_len, result, len(moves), mask):
+        _put_varint(out, value)
+    for i, j in moves:
+        _put_varint(out, i * cols + j)
+    return bytes(out)
+
+
+class GameRecord:
+    """One decoded game; ``moves`` may stop short of ``plies``."""
+
+    __slots__ = ("rows", "cols", "win_len", "result", "plies", "obstacles", "moves")
+
+    def __init__(self, rows: int, cols: int, win_len: int, result: int, plies: int,
+                 obstacles: Tuple[int, ...], moves: List[Move]) -> None:
+        self.rows = rows
+        self.cols = cols
+        self.win_len = win_len
+        self.result = result
+        self.plies = plies
+        self.obstacles = obstacles
+        self.moves = moves
+
+    @property
+    def winner(self) -> str:
+        """"X", "O", "draw" or "unfinished" (as in tournament results)."""
+        return RESULT_NAMES[self.result]
+
+    def position(self, ply: Optional[int] = None) -> Board:
+        """Board after the first *ply* moves (all decoded moves by default)."""
+        grid = [[Board.EMPTY] * self.cols for _ in range(self.rows)]
+        for idx in self.obstacles:
+            grid[idx // self.cols][idx % self.cols] = Board.OBSTACLE
+        board = Board.from_grid(grid, self.win_len)
+        turn = "X"
+        for i, j in self.moves[:ply]:
+            board.make_move(i, j, turn)
+            turn = "O" if turn == "X" else "X"
+        return board
+
+
+def decode_game(buf, pos: int, max_plies: Optional[int] = None) -> Tuple[GameRecord, int]:
+    """Game block at *pos*, decoding at most *max_plies* moves; also its end
+    (only meaningful when every move was decoded)."""
+    fields = []
+    for _ in range(6):
+        value, pos = _get_varint(buf, pos)
+        fields.append(value)
+    rows, cols, win_len, result, plies, mask = fields
+    obstacles = []
+    while mask:
+        low = mask & -mask
+        obstacles.append(low.bit_length() - 1)
+        mask ^= low
+    n = plies if max_plies is None else min(plies, max_plies)
+    moves = []
+    for _ in range(n):
+        idx, pos = _get_varint(buf, pos)
+        moves.append(divmod(idx, cols))
+    return GameRecord(rows, cols, win_len, result, plies, tuple(obstacles), moves), pos
+
+
+def _load_index(mm: mmap.mmap) -> Tuple[array, int]:
+    """Block offsets and where the blocks end: from the trailer, else a scan."""
+    size = len(mm)
+    if size >= _HEADER.size + _TRAILER.size:
+        start, count, magic = _TRAILER.unpack_from(mm, size - _TRAILER.size)
+        if magic == _MAGIC and start + 8 * count + _TRAILER.size == size:
+            index = array("Q", mm[start:start + 8 * count])
+            if sys.byteorder == "big":
+                index.byteswap()
+            return index, start
+    # no index (the writer did not close): walk the blocks, drop a torn tail
+    index, pos = array("Q"), _HEADER.size
+    while pos < size:
+        try:
+            _, end = decode_game(mm, pos)
+        except IndexError:
+            break
+        index.append(pos)
+        pos = end
+    return index, pos
+
+
+def _check_header(mm: mmap.mmap, path: str) -> None:
+    if len(mm) < _HEADER.size or _HEADER.unpack_from(mm, 0) != (_MAGIC, _VERSION):
+        raise ValueError(f"{path}: not a game record file (v{_VERSION})")
+
+
+# -------- writing -----------------------------------------------------------
+
+class GameWriter:
+    """Appends game blocks to *path*; ``close()`` writes the index."""
+
+    def __init__(self, path: str, append: bool = False) -> None:
+        self._index = array("Q")
+        if append and os.path.exists(path) and os.path.getsize(path):
+            with open(path, "rb") as f, \
+                    mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                _check_header(mm, path)
+                self._index, end = _load_index(mm)
+            self._file = open(path, "r+b", buffering=1 << 20)
+            self._file.truncate(end)        # the old index is rewritten on close
+            self._file.seek(end)
+            self._pos = end
+        else:
+            self._file = open(path, "wb", buffering=1 << 20)
+            self._file.write(_HEADER.pack(_MAGIC, _VERSION))
+            self._pos = _HEADER.size
+
+    def __len__(self) -> int:
+        return len(self._index)
+
+    def add_game(self, rows: int, cols: int, win_len: int, obstacles: Iterable[int],
+                 moves: Sequence[Move], result: int) -> int:
+        """Write one game; returns its number in the file."""
+        block = encode_game(rows, cols, win_len, obstacles, moves, result)
+        self._index.append(self._pos)
+        self._file.write(block)
+        self._pos += len(block)
+        return len(self._index) - 1
+
+    def flush(self) -> None:
+        self._file.flush()
+
+    def close(self) -> None:
+        if self._file.closed:
+            return
+        index = array("Q", self._index)
+        if sys.byteorder == "big":
+            index.byteswap()
+        self._file.write(index.tobytes())
+        self._file.write(_TRAILER.pack(self._pos, len(self._index), _MAGIC))
+        self._file.close()
+
+    def __enter__(self) -> "GameWriter":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+
+class GameRecorder:
+    """GameObserver that streams every game *controller* plays to *writer*.
+
+    A game is written when it ends, or as unfinished when the board is
+    reset mid-game or ``close()`` is called.
+    """
+
+    def __init__(self, writer: GameWriter, controller: GameController) -> None:
+        self._writer = writer
+        self._controller = controller
+        self._layout: Tuple = ()
+        self._moves: List[Move] = []
+        controller.register(self)
+
+    def on_board_change(self, coords: Tuple[int, int], symbol: str) -> None:
+        if not self._moves:
+            board = self._controller.getBoard()
+            self._layout = (board.rows, board.cols, board.win_len, obstacle_cells(board))
+        self._moves.append(coords)
+
+    def on_state_change(self, state: GameState, next_turn: Optional[str]) -> None:
+        if state is not GameState.IN_PROGRESS:
+            self._finish(_RESULTS[state])
+        elif self._moves and not self._controller.getBoard().move_count:
+            self._finish(UNFINISHED)        # reset before the game ended
+
+    def close(self) -> None:
+        self._finish(UNFINISHED)
+
+    def _finish(self, result: int) -> None:
+        if self._moves:
+            self._writer.add_game(*self._layout, self._moves, result)
+        self._moves = []
+
+
+# -------- reading -----------------------------------------------------------
+
+class GameReader:
+    """Read-only, memory-mapped view of one record file."""
+
+    def __init__(self, path: str) -> None:
+        with open(path, "rb") as f:
+            self._mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        _check_header(self._mm, path)
+        self._index, _ = _load_index(self._mm)
+
+    def __len__(self) -> int:
+        return len(self._index)
+
+    def __getitem__(self, n: int) -> GameRecord:
+        return decode_game(self._mm, self._index[n])[0]
+
+    def __iter__(self) -> Iterator[GameRecord]:
+        for offset in self._index:
+            yield decode_game(self._mm, offset)[0]
+
+    def position(self, n: int, ply: Optional[int] = None) -> Board:
+        """Board of game *n* after *ply* moves, decoding no further."""
+        return decode_game(self._mm, self._index[n], ply)[0].position()
+
+    def close(self) -> None:
+        self._mm.close()
+
+    def __enter__(self) -> "GameReader":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    p = argparse.ArgumentParser(description="Inspect game record files.")
+    p.add_argument("path")
+    p.add_argument("--game", type=int, help="print this game (0-based)")
+    p.add_argument("--ply", type=int, help="position after this many moves")
+    args = p.parse_args(argv)
+
+    with GameReader(args.path) as reader:
+        if args.game is None:
+            counts = {name: 0 for name in RESULT_NAMES.values()}
+            plies = 0
+            for game in reader:
+                counts[game.winner] += 1
+                plies += game.plies
+            print(f"{len(reader)} games, {plies} moves, {os.path.getsize(args.path)} bytes")
+            print("  " + "  ".join(f"{name} {n}" for name, n in counts.items()))
+            return 0
+        game = reader[args.game]
+        ply = game.plies if args.ply is None else min(args.ply, game.plies)
+        print(f"game {args.game}: {game.rows}x{game.cols}, {game.win_len} in a row, "
+              f"result {game.winner}, {game.plies} plies; after ply {ply}:")
+        for row in reader.position(args.game, ply).grid():
+            print("  " + " ".join(row))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
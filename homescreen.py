@@ -87,18 +87,23 @@ class HomeScreen(Screen):
         )
         
         # Difficulty buttons
-        easy_btn = Button(text='Easy', size_hint=(1, 0.3))
+        easy_btn = Button(text='Easy', size_hint=(1, 0.25))
         easy_btn.bind(on_release=lambda x: self.select_difficulty('easy', popup))
         
-        medium_btn = Button(text='Medium', size_hint=(1, 0.3))
+        medium_btn = Button(text='Medium', size_hint=(1, 0.25))
         medium_btn.bind(on_release=lambda x: self.select_difficulty('medium', popup))
         
-        hard_btn = Button(text='Hard', size_hint=(1, 0.3))
+        hard_btn = Button(text='Hard', size_hint=(1, 0.25))
         hard_btn.bind(on_release=lambda x: self.select_difficulty('hard', popup))
+
+        # Monte Carlo tree search – a different style, still weaker than Hard
+        mcts_btn = Button(text='Experimental (MCTS)', size_hint=(1, 0.25))
+        mcts_btn.bind(on_release=lambda x: self.select_difficulty('mcts', popup))
         
         content.add_widget(easy_btn)
         content.add_widget(medium_btn)
         content.add_widget(hard_btn)
+        content.add_widget(mcts_btn)
         
         popup.open()
     
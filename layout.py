@@ -5,7 +5,8 @@ from __future__ import annotations
 * Board **fills the window width** when the window is portrait / square.
 * Board never exceeds the window height; if landscape it shrinks to fit.
 * The square is **vertically centred**; status + restart stay at the bottom.
-* The playable 5 × 5 GameGrid is framed with a 1⁄12 margin (so each cell = 1⁄6 board side).
+* The board is a single-canvas BoardWidget filling the square; it draws
+  any rows × cols grid with square cells, centred inside it.
 """
 
 from typing import Optional, Tuple
@@ -23,7 +24,7 @@ from kivy.graphics import Rectangle
 from controller import GameController, GameState, GameObserver  # giữ nguyên
 from board import Board
 from themes import Theme
-from sound_manager import SoundManager
+from sound_manager import AudioService, get_audio
 from widgets_board import BoardWidget      # thêm dòng này
 
 
@@ -38,34 +39,36 @@ class TicTacToeLayout(FloatLayout):          # type: ignore[misc]
     status_message = StringProperty("X's turn")
 
     # --------------------------- construction ------------------------------ #
-    def __init__(self, controller: GameController, theme: Theme, **kw):
+    def __init__(self, controller: GameController, theme: Theme,
+                 audio: Optional[AudioService] = None, **kw):
         super().__init__(**kw)
 
         # ---------- background that stretches with the window -------------
         with self.canvas.before:
-            self._bg = Rectangle(source=theme.bg, pos=self.pos, size=self.size)
+            self._bg = Rectangle(texture=theme.background, pos=self.pos, size=self.size)
         self.bind(size=self._sync_bg, pos=self._sync_bg)
 
         # ---------- keep refs --------------------------------------------
         self._controller = controller
         self._board: Board = controller.getBoard()
         self._theme = theme
-        self._sounds = SoundManager()
+        self._sounds = audio or get_audio()       # shared, never per game
 
         # ---------- board container --------------------------------------
         self._board_container = FloatLayout(size_hint=(None, None),
                                             pos_hint={"center_x": .5, "center_y": .5})
 
 
-        # 5×5 playable grid (safe‑zone)
+        # playable grid, one canvas sized from board.rows × board.cols
         self._grid = BoardWidget(
             self._board,
             self._on_cell,            # callback đã có sẵn
+            theme,
+            size_hint=(1, 1),
         )
         # Căn giữa trong _board_container
         self._grid.pos_hint = {"center_x": .5, "center_y": .5}
         self._board_container.add_widget(self._grid)
-        self._grid.reset(self._board)
         # ---------- status + restart bar at the bottom --------------------
         BAR_HEIGHT   = 70
         LABEL_HEIGHT = 30
@@ -90,10 +93,11 @@ class TicTacToeLayout(FloatLayout):          # type: ignore[misc]
         self.add_widget(self._board_container)
         self.add_widget(self._ui_bar)
 
-        # respond to window resize
-        Window.bind(size=self._update_board_geometry)
+        # respond to window resize (Window binding: see attach_window)
+        self._window_bound = False
+        self._restart_event = None
         self.bind(size=self._update_board_geometry)
-        self._update_board_geometry()           # initial placement
+        self.attach_window()
 
         controller.register(self)               # listen for game events
 
@@ -115,6 +119,19 @@ class TicTacToeLayout(FloatLayout):          # type: ignore[misc]
         y_base = ui_h + (max(0, win_h - ui_h - side)) / 2
         self._board_container.pos = ((win_w - side) / 2, y_base)
 
+    def attach_window(self):
+        """Follow window resizes; call again after detach_window()."""
+        if not self._window_bound:
+            Window.bind(size=self._update_board_geometry)
+            self._window_bound = True
+        self._update_board_geometry()
+
+    def detach_window(self):
+        """Stop following the window while the screen is off-stage."""
+        if self._window_bound:
+            Window.unbind(size=self._update_board_geometry)
+            self._window_bound = False
+
     def _sync_bg(self, *_):
         self._bg.pos, self._bg.size = self.pos, self.size
 
@@ -123,10 +140,33 @@ class TicTacToeLayout(FloatLayout):          # type: ignore[misc]
         self._controller.play(row, col)
 
     def _on_restart(self, *_):
-        self._controller.reset()
+        self._cancel_restart()
+        self._controller.reset()            # also cancels a thinking bot
         self._grid.reset(self._board)
         self._hide_restart()
 
+    @property
+    def board(self) -> Board:
+        return self._board
+
+    def new_game(self, mode: str, difficulty: str, board: Optional[Board] = None):
+        """Reuse this layout for another game; the grid resizes in place."""
+        self._cancel_restart()
+        self._controller.reconfigure(mode, difficulty, board)
+        self._board = self._controller.getBoard()
+        self._grid.reset(self._board)
+        self._hide_restart()
+
+    def set_theme(self, theme: Theme):
+        """Switch element; textures are cached so nothing is reloaded."""
+        self._theme = theme
+        self._bg.texture = theme.background
+        self._grid.set_theme(theme)
+
+    def cancel_ai(self):
+        """Stop the bot from thinking/moving, e.g. when leaving the game."""
+        self._controller.cancel_ai()
+
     # ------------------- GameObserver callbacks --------------------------- #
     def on_board_change(self, coords: Tuple[int, int], symbol: str) -> None:
         self._grid.update_cell(coords, symbol)
@@ -147,7 +187,13 @@ class TicTacToeLayout(FloatLayout):          # type: ignore[misc]
 
     # --------------------------- helpers ---------------------------------- #
     def _end_game(self):
-        Clock.schedule_once(lambda *_: self._show_restart(), .3)
+        self._cancel_restart()
+        self._restart_event = Clock.schedule_once(lambda *_: self._show_restart(), .3)
+
+    def _cancel_restart(self):
+        if self._restart_event is not None:
+            self._restart_event.cancel()
+            self._restart_event = None
 
     def _show_restart(self):
         self._restart.disabled, self._restart.opacity = False, 1
@@ -0,0 +1,293 @@
+# mcts.py
+import math
+import random
+import threading
+import time
+from typing import Dict, List, Optional, Tuple
+
+from board import Board
+from bitboard import BitBoard, Engine
+from evaluation import LineEvaluator
+from move_ordering import candidate_moves
+from search_stats import SearchStats, log_stats
+from threat_search import ThreatSearch
+
+# Seconds the threat searches may spend before the playouts start: a
+# shallow one (fours and open threes), then a deep one.
+TACTICS_TIME, THREAT_TIME = 0.05, 0.2
+
+Move = Tuple[int, int]
+_NEIGHBOURS = [(di, dj) for di in (-1, 0, 1) for dj in (-1, 0, 1) if di or dj]
+
+
+class _Node:
+    """One position in the tree, reached by *player* playing *move*."""
+
+    __slots__ = ("move", "player", "parent", "key", "children", "untried",
+                 "visits", "wins", "terminal", "prior")
+
+    def __init__(self, move: Optional[Move], player: Optional[str],
+                 parent: Optional["_Node"], key: int) -> None:
+        self.move = move
+        self.player = player
+        self.parent = parent
+        self.key = key
+        self.children: Dict[Move, "_Node"] = {}
+        # (move, prior) pairs, strongest last; filled on first visit
+        self.untried: Optional[List[Tuple[Move, float]]] = None
+        self.visits = 0
+        self.wins = 0.0        # from *player*'s point of view
+        self.terminal = False
+        self.prior = 0.0       # heuristic strength of *move*, 0..1
+
+
+class MCTSAI:
+    """Monte Carlo Tree Search (UCT) for boards too big for full-width minimax.
+
+    Same interface as MinimaxAI.  Each move runs playouts until the time or
+    playout budget is spent and plays the most visited child.  The subtree
+    of the position actually reached is kept for the next move.
+
+    Random playouts are blind to short tactics, so unless *use_threats*
+    is off a threat search runs first: it plays immediate and forced
+    wins, and when the opponent threatens one (a four, or a three it can
+    convert) the playouts only choose among the moves that stop it.
+    """
+
+    def __init__(self, time_limit: float = 2.0, playouts: Optional[int] = None,
+                 exploration: float = 1.4, radius: int = 1,
+                 heuristic_rollouts: bool = True, prior_weight: float = 1.0,
+                 seed: Optional[int] = None, use_threats: bool = True):
+        self.time_limit = time_limit
+        self.playouts = playouts
+        self.exploration = exploration
+        self.radius = radius      # expansion only considers nearby cells
+        self.heuristic_rollouts = heuristic_rollouts
+        # progressive bias: line-threat prior that fades as visits grow
+        self.prior_weight = prior_weight
+        self._eval: Optional[LineEvaluator] = None
+        self.last_stats: Optional[SearchStats] = None
+        self._rng = random.Random(seed)
+        self.use_threats = use_threats
+        # the shallow pass catches direct threats the deep one may time out on
+        self._searches = (ThreatSearch(TACTICS_TIME, max_depth=2), ThreatSearch(THREAT_TIME))
+        self._root: Optional[_Node] = None
+        self._owner: Optional[tuple] = None
+        self._cancel = threading.Event()    # token of the running search
+        self._busy = threading.Lock()       # one search per instance at a time
+
+    def cancel(self) -> None:
+        """Stop the running search (see MinimaxAI.cancel)."""
+        self._cancel.set()
+
+    def get_best_move(self, board: Engine, ai_symbol: str, human_symbol: str,
+                      cancel: Optional[threading.Event] = None) -> Optional[Move]:
+        """Best move after the playouts; *cancel* as in MinimaxAI.get_best_move."""
+        with self._busy:
+            self._cancel = cancel or threading.Event()
+            return self._best_move(board, ai_symbol, human_symbol)
+
+    def _best_move(self, board: Engine, ai_symbol: str, human_symbol: str) -> Optional[Move]:
+        start = time.perf_counter()
+        if isinstance(board, Board):
+            board = BitBoard.from_board(board)
+        if board.is_full() or board.winner is not None:
+            return None
+
+        root_moves = None
+        for search in self._searches if self.use_threats else ():
+            verdict, moves = search.solve(board, ai_symbol, human_symbol)
+            if verdict == "win" or (verdict == "defend" and len(moves) == 1):
+                return self._forced(moves[0], search.nodes, start)
+            if verdict == "defend" and moves:
+                root_moves = moves      # anything else loses by force
+                break
+
+        self._eval = LineEvaluator(board)
+        if root_moves is None:
+            root = self._reuse_root(board, ai_symbol)
+        else:
+            root = _Node(None, None, None, board.hash_key)
+            root.untried = self._expansion_order(board, ai_symbol, root_moves)
+            self._owner = (board.rows, board.cols, board.win_len, ai_symbol)
+        deadline = start + self.time_limit if self.time_limit else math.inf
+        limit = self.playouts or math.inf
+        runs = 0
+        while runs < limit:
+            if not runs & 31 and (time.perf_counter() >= deadline or self._cancel.is_set()):
+                break
+            self._playout(board, root, ai_symbol, human_symbol)
+            runs += 1
+
+        score = None
+        if not root.children:
+            move = root.untried[-1][0] if root.untried else board.legal_moves()[0]
+            self._root = None
+        else:
+            best = max(root.children.values(), key=lambda n: n.visits)
+            move, score = best.move, best.wins / best.visits
+            best.parent = None       # keep only the subtree we move into
+            self._root = best
+
+        self.last_stats = SearchStats(
+            move=move, source="mcts", score=score, nodes=runs,
+            depth_reached=self._depth(self._root),
+            branching=len(root.children),
+            elapsed=time.perf_counter() - start,
+        )
+        log_stats(self.last_stats)
+        return move
+
+    def _forced(self, move: Move, nodes: int, start: float) -> Move:
+        """Play a move the threat search proved; the tree is dropped."""
+        self._root = None
+        self.last_stats = SearchStats(
+            move=move, source="threat", nodes=nodes,
+            elapsed=time.perf_counter() - start,
+        )
+        log_stats(self.last_stats)
+        return move
+
+    # -------- tree reuse --------------------------------------------------
+
+    def _reuse_root(self, board: BitBoard, ai_symbol: str) -> _Node:
+        """The stored subtree for this position, if the opponent has replied.
+
+        The stored root is the position after our own move, expanded for
+        the opponent; only its children (our turn again) are reused.  The
+        hash does not encode the side to move, so the stored root itself
+        is never matched.
+        """
+        owner = (board.rows, board.cols, board.win_len, ai_symbol)
+        key = board.hash_key
+        old, self._root = self._root, None
+        if old is not None and owner == self._owner:
+            for child in old.children.values():
+                if child.key == key:
+                    child.parent = None
+                    return child
+        self._owner = owner
+        return _Node(None, None, None, key)
+
+    @staticmethod
+    def _depth(node: Optional[_Node]) -> int:
+        depth = 0
+        while node is not None and node.children:
+            node = max(node.children.values(), key=lambda n: n.visits)
+            depth += 1
+        return depth
+
+    # -------- one playout -------------------------------------------------
+
+    def _playout(self, board: BitBoard, root: _Node, ai_symbol: str, human_symbol: str) -> None:
+        node, turn, played = root, ai_symbol, 0
+        rng = self._rng
+
+        evaluator = self._eval
+
+        # selection: descend through fully expanded nodes by UCT
+        while not node.terminal:
+            if node.untried is None:
+                node.untried = self._expansion_order(board, turn)
+            if node.untried or not node.children:
+                break
+            node = self._select(node)
+            board.make_move(node.move[0], node.move[1], turn)
+            evaluator.apply(node.move[0], node.move[1], turn)
+            played += 1
+            turn = human_symbol if turn == ai_symbol else ai_symbol
+
+        # expansion: strongest-looking untried move first
+        if not node.terminal and node.untried:
+            (i, j), prior = node.untried.pop()
+            board.make_move(i, j, turn)
+            evaluator.apply(i, j, turn)
+            played += 1
+            child = _Node((i, j), turn, node, board.hash_key)
+            child.terminal = board.winner is not None or board.is_dead_draw()
+            child.prior = prior
+            node.children[(i, j)] = child
+            node = child
+            turn = human_symbol if turn == ai_symbol else ai_symbol
+
+        # simulation
+        winner = board.winner if node.terminal else self._rollout(board, turn)
+
+        for _ in range(played):
+            i, j = board.last_move
+            evaluator.revert(i, j, board.get(i, j))
+            board.unmake_move()
+
+        # backpropagation
+        while node is not None:
+            node.visits += 1
+            if winner is None:
+                node.wins += 0.5
+            elif winner == node.player:
+                node.wins += 1.0
+            node = node.parent
+
+    def _expansion_order(self, board: BitBoard, turn: str,
+                         moves: Optional[List[Move]] = None) -> List[Tuple[Move, float]]:
+        """Candidate moves (or *moves*) with a 0..1 prior, weakest first."""
+        other = "O" if turn == "X" else "X"
+        ev = self._eval
+        if moves is None:
+            moves = candidate_moves(board, self.radius)
+        # own gain counts double: a win beats blocking the opponent's
+        gains = [2 * ev.move_gain(i, j, turn) + ev.move_gain(i, j, other) for i, j in moves]
+        top = max(gains, default=0) or 1
+        scored = [(move, gain / top) for move, gain in zip(moves, gains)]
+        self._rng.shuffle(scored)          # random tie-break
+        scored.sort(key=lambda mp: mp[1])
+        return scored
+
+    def _select(self, node: _Node) -> _Node:
+        log_n = math.log(node.visits or 1)
+        c, w = self.exploration, self.prior_weight
+        best, best_value = None, -math.inf
+        for child in node.children.values():
+            if child.terminal and child.visits and child.wins == child.visits:
+                return child  # a move that wins on the spot
+            value = (child.wins / child.visits
+                     + c * math.sqrt(log_n / child.visits)
+                     + w * child.prior / (child.visits + 1))
+            if value > best_value:
+                best, best_value = child, value
+        return best
+
+    def _rollout(self, board: BitBoard, turn: str) -> Optional[str]:
+        """Play to the end (then take it all back) and return the winner.
+
+        Heuristic rollouts answer near the previous move half of the time,
+        which mimics real k-in-a-row play far better than uniform moves.
+        """
+        rng = self._rng
+        rows, cols = board.rows, board.cols
+        empties = board.legal_moves()
+        rng.shuffle(empties)
+        last = board.last_move
+        played = 0
+        while board.winner is None and not board.is_dead_draw():
+            move = None
+            if self.heuristic_rollouts and last is not None and rng.random() < 0.5:
+                i, j = last
+                near = [
+                    (i + di, j + dj) for di, dj in _NEIGHBOURS
+                    if 0 <= i + di < rows and 0 <= j + dj < cols
+                    and board.is_empty(i + di, j + dj)
+                ]
+                if near:
+                    move = rng.choice(near)
+            if move is None:
+                move = empties.pop()
+                while not board.is_empty(*move):
+                    move = empties.pop()
+            board.make_move(move[0], move[1], turn)
+            played += 1
+            last = move
+            turn = "O" if turn == "X" else "X"
+        winner = board.winner
+        for _ in range(played):
+            board.unmake_move()
+        return winner
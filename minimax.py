@@ -1,121 +1,396 @@
 # minimax.py
-from typing import List, Tuple, Optional
+from typing import List, NamedTuple, Tuple, Optional
 from board import Board
+from bitboard import BitBoard, Engine
+from transposition import TranspositionTable, EXACT, LOWER, UPPER
+from evaluation import LineEvaluator
+from move_ordering import MoveOrderer, candidate_moves
+from opening_book import load_book
+from tablebase import load_tablebase
+from search_stats import SearchStats, log_stats
+from threat_search import MIN_WIN_LEN, ThreatSearch
 import random
 import math
+import threading
+import time
+
+WIN_SCORE = 1_000_000
+# Scores beyond this are wins/losses at a known distance from the node;
+# heuristic evaluations always stay below it.
+MATE_BOUND = WIN_SCORE - 10_000
+
+
+class SearchBudget(NamedTuple):
+    """Per-move limits for the iterative-deepening search."""
+    time_limit: Optional[float] = None   # seconds of wall-clock time
+    node_limit: Optional[int] = None     # positions visited
+    max_depth: Optional[int] = None      # hard cap on plies
+
+
+# Each difficulty is a budget, not a depth: the search goes as deep as
+# the budget allows on the current board.
+BUDGETS = {
+    "easy": SearchBudget(time_limit=0.05, node_limit=300),
+    "medium": SearchBudget(time_limit=0.25, node_limit=5_000),
+    "hard": SearchBudget(time_limit=1.5),
+}
+# Seconds the threat search may spend before the main search starts.
+THREAT_TIME = 0.2
+
+
+class _SearchTimeout(Exception):
+    """Raised inside the search when the budget is spent or it is cancelled."""
+
 
 class MinimaxAI:
     """Minimax AI implementation for Tic Tac Toe with adjustable difficulty."""
-    
-    def __init__(self, difficulty: str = "medium"):
+
+    def __init__(self, difficulty: str = "medium", engine: str = "bitboard",
+                 tt_size: int = 1 << 16, budget: Optional[SearchBudget] = None,
+                 radius: int = 2, use_book: Optional[bool] = None,
+                 use_tablebase: Optional[bool] = None, collect_pv: bool = False,
+                 use_threats: Optional[bool] = None):
         self.difficulty = difficulty
-        self.max_depth = self._get_max_depth()
-        
-    def _get_max_depth(self) -> int:
-        """Set search depth based on difficulty."""
-        if self.difficulty == "easy":
-            return 1
-        elif self.difficulty == "medium":
-            return 2
-        else:  # hard
-            return 3
-    
-    def get_best_move(self, board: Board, ai_symbol: str, human_symbol: str) -> Optional[Tuple[int, int]]:
-        """Get the best move for the AI player."""
+        self.engine = engine  # "bitboard" converts the Board before searching
+        self.radius = radius  # only cells this close to a stone are searched
+        # the easy bot should stay beatable, so it plays without the book
+        self.use_book = difficulty != "easy" if use_book is None else use_book
+        # perfect play is what "hard" means on boards small enough to solve
+        self.use_tablebase = difficulty == "hard" if use_tablebase is None else use_tablebase
+        self.budget = budget or self._get_budget()
+        # forcing sequences run far deeper than the full-width search
+        self.use_threats = difficulty == "hard" if use_threats is None else use_threats
+        self._threats = ThreatSearch(THREAT_TIME)
+        self.max_depth = 0      # depth of the iteration being searched
+        self.depth_reached = 0  # deepest fully completed iteration
+        self.nodes = 0
+        self.cutoffs = 0
+        self.tt_probes = 0
+        self.tt_hits = 0
+        self._expanded = 0      # interior nodes whose children were searched
+        self._children = 0
+        self.collect_pv = collect_pv  # walk the table for the PV after each move
+        self.last_stats: Optional[SearchStats] = None
+        self._deadline = math.inf
+        self._node_limit = math.inf
+        self._eval: Optional[LineEvaluator] = None
+        self._orderer = MoveOrderer()
+        self._cancel = threading.Event()    # token of the running search
+        self._busy = threading.Lock()       # one search per instance at a time
+        # Survives between moves; cleared when the game setup changes.
+        self.tt = TranspositionTable(tt_size)
+        self._tt_owner: Optional[tuple] = None
+
+    def _get_budget(self) -> SearchBudget:
+        """Set search budget based on difficulty."""
+        return BUDGETS.get(self.difficulty, BUDGETS["hard"])
+
+    def cancel(self) -> None:
+        """Abort the search running on another thread as soon as possible.
+
+        The interrupted call still returns its best move so far; callers
+        that cancelled are expected to ignore it.  A cancel() that lands
+        before the search starts is lost: pass a token to get_best_move
+        when the search is started from another thread.
+        """
+        self._cancel.set()
+
+    def get_best_move(self, board: Engine, ai_symbol: str, human_symbol: str,
+                      cancel: Optional[threading.Event] = None) -> Optional[Tuple[int, int]]:
+        """Get the best move for the AI player.
+
+        Setting *cancel* aborts this search, even if it is set before the
+        search starts; it is never cleared here.  Calls on one instance
+        run one at a time (they share the table and counters).
+        Afterwards ``last_stats`` describes how the move was found.
+        """
+        with self._busy:
+            self._cancel = cancel or threading.Event()
+            return self._best_move(board, ai_symbol, human_symbol)
+
+    def _best_move(self, board: Engine, ai_symbol: str,
+                   human_symbol: str) -> Optional[Tuple[int, int]]:
+        start = time.perf_counter()
+        if self.engine == "bitboard" and isinstance(board, Board):
+            board = BitBoard.from_board(board)
+
+        self._reset_counters()
+        move, source, score = self._choose_move(board, ai_symbol, human_symbol)
+        if move is None:
+            return None
+
+        stats = SearchStats(
+            move=move, source=source, score=score, nodes=self.nodes,
+            cutoffs=self.cutoffs, tt_probes=self.tt_probes, tt_hits=self.tt_hits,
+            depth_reached=self.depth_reached,
+            branching=self._children / self._expanded if self._expanded else 0.0,
+        )
+        if self.collect_pv and source == "search":
+            stats.pv = self._principal_variation(board, ai_symbol, human_symbol)
+        stats.elapsed = time.perf_counter() - start
+        self.last_stats = stats
+        log_stats(stats)
+        return move
+
+    def _choose_move(self, board: Engine, ai_symbol: str, human_symbol: str
+                     ) -> Tuple[Optional[Tuple[int, int]], str, Optional[float]]:
+        """The move, where it came from and its search score (if searched)."""
         # Get all legal moves
-        legal_moves = []
-        for i in range(board.rows):
-            for j in range(board.cols):
-                if board.is_empty(i, j):
-                    legal_moves.append((i, j))
-        
+        legal_moves = board.legal_moves()
+
         if not legal_moves:
-            return None
-            
+            return None, "none", None
+
         # Easy mode: sometimes make random moves
         if self.difficulty == "easy" and random.random() < 0.4:
-            return random.choice(legal_moves)
-        
-        # Find best move using minimax
+            return random.choice(legal_moves), "random", None
+
+        # Small obstacle-free boards may be solved outright.
+        if self.use_tablebase:
+            move = self._tablebase_move(board, ai_symbol)
+            if move is not None:
+                return move, "tablebase", None
+
+        # Early, obstacle-free positions may be in the precomputed book.
+        if self.use_book:
+            book = load_book(board.rows, board.cols, board.win_len)
+            if book is not None:
+                move = book.lookup(board.hash_key)
+                if move is not None and board.is_empty(*move):
+                    return move, "book", None
+
+        root_moves = None
+        if self.use_threats and board.win_len >= MIN_WIN_LEN:
+            verdict, moves = self._threats.solve(board, ai_symbol, human_symbol)
+            if verdict == "win":
+                return moves[0], "threat", None
+            if verdict == "defend" and moves:
+                # the opponent has a forced win: only these moves stop it
+                if len(moves) == 1:
+                    return moves[0], "threat", None
+                root_moves = moves
+
+        move, score = self.search(board, ai_symbol, human_symbol, root_moves)
+        return move, "search", score
+
+    def _reset_counters(self) -> None:
+        self.nodes = self.cutoffs = self.tt_probes = self.tt_hits = 0
+        self._expanded = self._children = 0
+        self.depth_reached = 0
+
+    def _principal_variation(self, board: Engine, ai_symbol: str,
+                             human_symbol: str) -> List[Tuple[int, int]]:
+        """Follow the table's best moves from the root."""
+        pv: List[Tuple[int, int]] = []
+        symbol = ai_symbol
+        while len(pv) < max(self.depth_reached, 1) and board.winner is None:
+            entry = self.tt.probe(board.hash_key)
+            if entry is None or entry.move is None or not board.is_empty(*entry.move):
+                break
+            pv.append(entry.move)
+            board.make_move(*entry.move, symbol)
+            symbol = human_symbol if symbol == ai_symbol else ai_symbol
+        for _ in pv:
+            board.unmake_move()
+        return pv
+
+    def _tablebase_move(self, board: Engine, ai_symbol: str) -> Optional[Tuple[int, int]]:
+        tb = load_tablebase(board.rows, board.cols, board.win_len)
+        if tb is None or any(
+            board.is_obstacle(i, j) for i in range(board.rows) for j in range(board.cols)
+        ):
+            return None
+        return tb.best_move(board, ai_symbol)
+
+    def search(self, board: Engine, ai_symbol: str, human_symbol: str,
+               root_moves: Optional[List[Tuple[int, int]]] = None) -> Tuple[Tuple[int, int], float]:
+        """Iterative-deepening search of a non-terminal position.
+
+        Returns the best move and its score.  *root_moves* restricts the
+        moves tried at the root (used to split work between processes).
+        """
+        owner = (board.rows, board.cols, board.win_len, ai_symbol)
+        if owner != self._tt_owner:
+            self.tt.clear()
+            self._tt_owner = owner
+        self.tt.new_search()
+        self._orderer.new_search()
+        self._eval = LineEvaluator(board)
+        self._reset_counters()
+        if root_moves is None:
+            root_moves = candidate_moves(board, self.radius)
+
+        budget = self.budget
+        start = time.perf_counter()
+        self._deadline = start + budget.time_limit if budget.time_limit else math.inf
+        self._node_limit = budget.node_limit or math.inf
+        depth_cap = len(board.legal_moves())
+        if budget.max_depth:
+            depth_cap = min(depth_cap, budget.max_depth)
+
+        # Iterative deepening: every finished iteration leaves its best move
+        # in the table, so the next one searches it first.
+        best_move, best_score = root_moves[0], -math.inf
+        for depth in range(1, depth_cap + 1):
+            self.max_depth = depth
+            try:
+                move, score = self._search_root(board, root_moves, ai_symbol, human_symbol)
+            except _SearchTimeout:
+                break
+            best_move, best_score = move, score
+            self.depth_reached = depth
+            if abs(score) > MATE_BOUND:
+                break  # forced result found; deeper search cannot change it
+
+        return best_move, best_score
+
+    def _search_root(self, board: Engine, root_moves: List[Tuple[int, int]],
+                     ai_symbol: str, human_symbol: str) -> Tuple[Tuple[int, int], float]:
+        """One pass over the root moves at ``self.max_depth``."""
         best_score = -math.inf
-        best_move = legal_moves[0]
-        
-        for move in legal_moves:
-            i, j = move
-            # Try the move
-            board._grid[i][j] = ai_symbol
-            board._legal.remove((i, j))
-            
-            # Get score for this move
-            score = self._minimax(board, 0, False, ai_symbol, human_symbol, -math.inf, math.inf)
-            
-            # Undo the move
-            board._grid[i][j] = board.EMPTY
-            board._legal.add((i, j))
-            
-            # Update best move
-            if score > best_score:
-                best_score = score
-                best_move = move
-        
-        return best_move
-    
-    def _minimax(self, board: Board, depth: int, is_maximizing: bool, 
+        best_move = root_moves[0]
+        base = board.move_count
+
+        try:
+            for move in self._ordered(board, root_moves, 0, ai_symbol, evaluator=self._eval):
+                i, j = move
+                # Try the move
+                self._play(board, i, j, ai_symbol)
+
+                # Get score for this move
+                score = self._minimax(board, 1, False, ai_symbol, human_symbol, best_score, math.inf)
+
+                # Undo the move
+                self._undo(board)
+
+                # Update best move
+                if score > best_score:
+                    best_score = score
+                    best_move = move
+        except _SearchTimeout:
+            # unwind the moves left on the board by the aborted search
+            while board.move_count > base:
+                self._undo(board)
+            raise
+
+        self.tt.store(board.hash_key, self.max_depth, best_score, EXACT, best_move)
+        return best_move, best_score
+
+    def _minimax(self, board: Engine, depth: int, is_maximizing: bool,
                  ai_symbol: str, human_symbol: str, alpha: float, beta: float) -> float:
-        """Minimax algorithm with alpha-beta pruning."""
-        # Check terminal states
-        if board.has_winner(ai_symbol):
-            return 10 - depth
-        elif board.has_winner(human_symbol):
-            return depth - 10
-        elif board.is_full() or depth >= self.max_depth:
-            return 0
-        
-        if is_maximizing:
-            max_eval = -math.inf
-            
-            for i in range(board.rows):
-                for j in range(board.cols):
-                    if board.is_empty(i, j):
-                        # Make move
-                        board._grid[i][j] = ai_symbol
-                        board._legal.remove((i, j))
-                        
-                        # Recurse
-                        eval_score = self._minimax(board, depth + 1, False, ai_symbol, human_symbol, alpha, beta)
-                        
-                        # Undo move
-                        board._grid[i][j] = board.EMPTY
-                        board._legal.add((i, j))
-                        
-                        max_eval = max(max_eval, eval_score)
-                        alpha = max(alpha, eval_score)
-                        
-                        if beta <= alpha:
-                            break
-                            
-            return max_eval
+        """Minimax algorithm with alpha-beta pruning and a transposition table.
+
+        Scores are from the AI's point of view; *depth* is the ply from
+        the root, so quicker wins (and slower losses) score higher.
+        """
+        self.nodes += 1
+        if self.nodes >= self._node_limit or (
+            not self.nodes & 255
+            and (time.perf_counter() >= self._deadline or self._cancel.is_set())
+        ):
+            raise _SearchTimeout
+        # Check terminal states (decided from the last move only)
+        winner = board.winner
+        if winner == ai_symbol:
+            return WIN_SCORE - depth
+        elif winner == human_symbol:
+            return depth - WIN_SCORE
+        elif board.is_dead_draw():
+            return 0  # full, or no line left that either side can complete
+        elif depth >= self.max_depth:
+            return self._eval.evaluate(ai_symbol)
+
+        key = board.hash_key
+        remaining = self.max_depth - depth
+        entry = self.tt.probe(key)
+        self.tt_probes += 1
+        if entry is not None:
+            self.tt_hits += 1
+        if entry is not None and entry.depth >= remaining:
+            value = _from_tt(entry.value, depth)
+            if entry.flag == EXACT:
+                return value
+            if entry.flag == LOWER:
+                alpha = max(alpha, value)
+            else:
+                beta = min(beta, value)
+            if beta <= alpha:
+                return value
+
+        alpha_orig, beta_orig = alpha, beta
+        symbol = ai_symbol if is_maximizing else human_symbol
+        best = -math.inf if is_maximizing else math.inf
+        best_move = None
+
+        moves = candidate_moves(board, self.radius)
+        self._expanded += 1
+        # threat scoring pays off only where a subtree is left to prune
+        evaluator = self._eval if remaining > 1 else None
+        for i, j in self._ordered(board, moves, depth, symbol, entry, evaluator):
+            # Make move
+            self._play(board, i, j, symbol)
+
+            # Recurse
+            eval_score = self._minimax(board, depth + 1, not is_maximizing, ai_symbol, human_symbol, alpha, beta)
+
+            # Undo move
+            self._undo(board)
+            self._children += 1
+
+            if is_maximizing:
+                if eval_score > best:
+                    best, best_move = eval_score, (i, j)
+                alpha = max(alpha, eval_score)
+            else:
+                if eval_score < best:
+                    best, best_move = eval_score, (i, j)
+                beta = min(beta, eval_score)
+
+            if beta <= alpha:
+                self.cutoffs += 1
+                self._orderer.record_cutoff((i, j), depth, remaining)
+                break
+
+        if best <= alpha_orig:
+            flag = UPPER
+        elif best >= beta_orig:
+            flag = LOWER
         else:
-            min_eval = math.inf
-            
-            for i in range(board.rows):
-                for j in range(board.cols):
-                    if board.is_empty(i, j):
-                        # Make move
-                        board._grid[i][j] = human_symbol
-                        board._legal.remove((i, j))
-                        
-                        # Recurse
-                        eval_score = self._minimax(board, depth + 1, True, ai_symbol, human_symbol, alpha, beta)
-                        
-                        # Undo move
-                        board._grid[i][j] = board.EMPTY
-                        board._legal.add((i, j))
-                        
-                        min_eval = min(min_eval, eval_score)
-                        beta = min(beta, eval_score)
-                        
-                        if beta <= alpha:
-                            break
-                            
-            return min_eval
+            flag = EXACT
+        self.tt.store(key, remaining, _to_tt(best, depth), flag, best_move)
+        return best
+
+    def _play(self, board: Engine, i: int, j: int, symbol: str) -> None:
+        """Make a move on the board and in the incremental evaluator."""
+        board.make_move(i, j, symbol)
+        self._eval.apply(i, j, symbol)
+
+    def _undo(self, board: Engine) -> None:
+        i, j = board.last_move
+        symbol = board.get(i, j)
+        board.unmake_move()
+        self._eval.revert(i, j, symbol)
+
+    def _ordered(self, board: Engine, moves: List[Tuple[int, int]], depth: int,
+                 symbol: str, entry=None, evaluator=None) -> List[Tuple[int, int]]:
+        """Table move first, then killers, history and threat score."""
+        if entry is None:
+            entry = self.tt.probe(board.hash_key)
+        tt_move = entry.move if entry is not None else None
+        return self._orderer.order(moves, depth, tt_move, evaluator, symbol)
+
+def _to_tt(value: float, depth: int) -> float:
+    """Make win/loss scores relative to the node before storing them."""
+    if value > MATE_BOUND:
+        return value + depth
+    if value < -MATE_BOUND:
+        return value - depth
+    return value
+
+
+def _from_tt(value: float, depth: int) -> float:
+    if value > MATE_BOUND:
+        return value - depth
+    if value < -MATE_BOUND:
+        return value + depth
+    return value
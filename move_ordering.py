@@ -0,0 +1,80 @@
+# move_ordering.py
+from typing import Dict, List, Optional, Tuple
+
+Move = Tuple[int, int]
+
+
+def candidate_moves(board, radius: int = 2) -> List[Move]:
+    """Empty cells within *radius* (Chebyshev distance) of any stone.
+
+    On an empty board the cell closest to the centre is offered instead.
+    Far-away cells rarely matter in a k-in-a-row game, so on large boards
+    this cuts the branching factor from rows·cols to a few dozen.
+    """
+    rows, cols = board.rows, board.cols
+    stones = board.stones()
+    if not stones:
+        legal = board.legal_moves()
+        if not legal:
+            return []
+        ci, cj = (rows - 1) / 2, (cols - 1) / 2
+        return [min(legal, key=lambda m: (abs(m[0] - ci) + abs(m[1] - cj), m))]
+
+    seen = set()
+    for si, sj in stones:
+        for i in range(max(0, si - radius), min(rows, si + radius + 1)):
+            for j in range(max(0, sj - radius), min(cols, sj + radius + 1)):
+                seen.add((i, j))
+    moves = [m for m in seen if board.is_empty(*m)]
+    if not moves:
+        # every neighbour is taken; fall back to the rest of the board
+        return board.legal_moves()
+    moves.sort()
+    return moves
+
+
+class MoveOrderer:
+    """Orders moves so alpha-beta sees the likely-best ones first.
+
+    Priority: transposition-table move, then the two killer moves of the
+    ply, then history-heuristic score plus the move's threat score (how
+    much it builds the mover's lines and breaks the opponent's).
+    """
+
+    def __init__(self) -> None:
+        self._killers: Dict[int, List[Move]] = {}
+        self._history: Dict[Move, int] = {}
+
+    def new_search(self) -> None:
+        """Forget killers and age the history between moves."""
+        self._killers.clear()
+        for move in self._history:
+            self._history[move] >>= 1
+
+    def record_cutoff(self, move: Move, ply: int, remaining: int) -> None:
+        """*move* refuted the position at *ply* with *remaining* depth left."""
+        killers = self._killers.setdefault(ply, [])
+        if move not in killers:
+            killers.insert(0, move)
+            del killers[2:]
+        self._history[move] = self._history.get(move, 0) + remaining * remaining
+
+    def order(self, moves: List[Move], ply: int, tt_move: Optional[Move],
+              evaluator=None, symbol: Optional[str] = None) -> List[Move]:
+        killers = self._killers.get(ply, ())
+        history = self._history
+        other = "O" if symbol == "X" else "X"
+
+        def key(move: Move) -> float:
+            if move == tt_move:
+                return float("inf")
+            score = history.get(move, 0)
+            if evaluator is not None:
+                i, j = move
+                # own gain counts double: a win beats blocking the opponent's
+                score += 2 * evaluator.move_gain(i, j, symbol) + evaluator.move_gain(i, j, other)
+            if move in killers:
+                score += 1_000_000 * (2 - killers.index(move))
+            return score
+
+        return sorted(moves, key=key, reverse=True)
@@ -0,0 +1,155 @@
+# opening_book.py
+"""Opening book: precomputed moves for the first plies of obstacle-free games.
+
+Generate offline, e.g.::
+
+    python opening_book.py                      # every COMMON_SETTINGS entry
+    python opening_book.py --rows 7 --cols 7 --win-len 5 --plies 5 --time 10
+
+Book files live in ``books/`` and hold a small header followed by
+fixed-size records ``(zobrist key u64, cell u16)`` sorted by key.
+Lookups memory-map the file and binary-search it, so nothing is read
+until a position is actually probed.
+"""
+import argparse
+import mmap
+import os
+import struct
+import sys
+from functools import lru_cache
+from typing import Dict, List, Optional, Tuple
+
+from bitboard import BitBoard
+from move_ordering import candidate_moves
+
+BOOK_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "books")
+COMMON_SETTINGS = [(3, 3, 3), (4, 4, 3), (5, 5, 4), (6, 6, 4), (7, 7, 5)]
+
+_MAGIC = b"TTTB"
+_HEADER = struct.Struct("<4sBBBBI")   # magic, version, rows, cols, win_len, count
+_RECORD = struct.Struct("<QH")        # key, cell index (i * cols + j)
+_VERSION = 1
+
+
+def book_path(rows: int, cols: int, win_len: int) -> str:
+    return os.path.join(BOOK_DIR, f"book_{rows}x{cols}_{win_len}.bin")
+
+
+class OpeningBook:
+    """Read-only, memory-mapped view of one book file."""
+
+    def __init__(self, path: str) -> None:
+        with open(path, "rb") as f:
+            self._mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, version, self.rows, self.cols, self.win_len, self._count = \
+            _HEADER.unpack_from(self._mm, 0)
+        if magic != _MAGIC or version != _VERSION:
+            raise ValueError(f"{path}: not an opening book (v{_VERSION})")
+
+    def __len__(self) -> int:
+        return self._count
+
+    def lookup(self, key: int) -> Optional[Tuple[int, int]]:
+        lo, hi = 0, self._count
+        mm, base, size = self._mm, _HEADER.size, _RECORD.size
+        while lo < hi:
+            mid = (lo + hi) // 2
+            k, cell = _RECORD.unpack_from(mm, base + mid * size)
+            if k == key:
+                return divmod(cell, self.cols)
+            if k < key:
+                lo = mid + 1
+            else:
+                hi = mid
+        return None
+
+
+@lru_cache(maxsize=None)
+def load_book(rows: int, cols: int, win_len: int) -> Optional[OpeningBook]:
+    """The book for this setting, or None if none was generated."""
+    path = book_path(rows, cols, win_len)
+    if not os.path.exists(path):
+        return None
+    return OpeningBook(path)
+
+
+def write_book(path: str, rows: int, cols: int, win_len: int,
+               entries: Dict[int, Tuple[int, int]]) -> None:
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, "wb") as f:
+        f.write(_HEADER.pack(_MAGIC, _VERSION, rows, cols, win_len, len(entries)))
+        for key in sorted(entries):
+            i, j = entries[key]
+            f.write(_RECORD.pack(key, i * cols + j))
+
+
+# -------- offline generation ----------------------------------------------
+
+def generate(rows: int, cols: int, win_len: int, plies: int,
+             time_limit: float, reply_radius: int = 1) -> Dict[int, Tuple[int, int]]:
+    """Deep-search every book position up to *plies* for both colours.
+
+    The book side plays its searched move; the other side tries every
+    cell within *reply_radius* of the stones, which covers sensible
+    human openings without exploding the tree.
+    """
+    # imported here: minimax itself consults the book at run time
+    from minimax import MinimaxAI, SearchBudget
+
+    ai = MinimaxAI("hard", budget=SearchBudget(time_limit=time_limit), use_book=False)
+    board = BitBoard(rows, cols, win_len)
+    entries: Dict[int, Tuple[int, int]] = {}
+    seen = set()
+
+    def expand(turn: str, book_side: str, ply: int) -> None:
+        key = (board.hash_key, book_side)
+        if ply >= plies or board.winner or board.is_full() or key in seen:
+            return
+        seen.add(key)
+        other = "O" if turn == "X" else "X"
+        if turn == book_side:
+            move = entries.get(board.hash_key)
+            if move is None:
+                move, _ = ai.search(board, turn, other)
+                entries[board.hash_key] = move
+                print(f"  {len(entries):5d} positions", end="\r", flush=True)
+            replies: List[Tuple[int, int]] = [move]
+        elif board.stones():
+            replies = candidate_moves(board, reply_radius)
+        else:
+            replies = board.legal_moves()
+        for i, j in replies:
+            board.make_move(i, j, turn)
+            expand(other, book_side, ply + 1)
+            board.unmake_move()
+
+    for book_side in ("X", "O"):
+        expand("X", book_side, 0)
+    print()
+    return entries
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    p = argparse.ArgumentParser(description="Generate opening book files.")
+    p.add_argument("--rows", type=int)
+    p.add_argument("--cols", type=int)
+    p.add_argument("--win-len", type=int)
+    p.add_argument("--plies", type=int, default=4)
+    p.add_argument("--time", type=float, default=5.0, help="seconds per position")
+    args = p.parse_args(argv)
+
+    if args.rows:
+        settings = [(args.rows, args.cols or args.rows, args.win_len or min(args.rows, 4))]
+    else:
+        settings = COMMON_SETTINGS
+    for rows, cols, win_len in settings:
+        print(f"{rows}x{cols}, {win_len} in a row, {args.plies} plies")
+        entries = generate(rows, cols, win_len, args.plies, args.time)
+        path = book_path(rows, cols, win_len)
+        write_book(path, rows, cols, win_len, entries)
+        print(f"  wrote {len(entries)} positions to {path}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,155 @@
+# parallel_search.py
+"""Root-parallel MinimaxAI: the root moves are split over worker processes.
+
+The position travels through ``multiprocessing.shared_memory`` – one byte
+per cell plus a cancel flag – so no Board is pickled per task.  Workers
+are long-lived and keep their own MinimaxAI (and transposition table)
+between moves.
+"""
+import os
+from concurrent.futures import ProcessPoolExecutor, wait
+from multiprocessing import shared_memory
+from typing import List, Optional, Tuple
+
+from board import Board
+from bitboard import BitBoard, Engine
+from minimax import MinimaxAI, SearchBudget
+from move_ordering import candidate_moves
+
+# Cell codes in the shared buffer; byte 0 is the cancel flag.
+_CODES = {Board.EMPTY: 0, "X": 1, "O": 2, Board.OBSTACLE: 3}
+_HEADER = 1
+
+_executor: Optional[ProcessPoolExecutor] = None
+_executor_size = 0
+
+
+def _get_executor(workers: int) -> ProcessPoolExecutor:
+    """Process pool shared by every ParallelMinimaxAI in this process."""
+    global _executor, _executor_size
+    if _executor is None or _executor_size < workers:
+        if _executor is not None:
+            _executor.shutdown(wait=False, cancel_futures=True)
+        _executor = ProcessPoolExecutor(max_workers=workers)
+        _executor_size = workers
+    return _executor
+
+
+def shutdown_pool() -> None:
+    global _executor, _executor_size
+    if _executor is not None:
+        _executor.shutdown(wait=True, cancel_futures=True)
+    _executor, _executor_size = None, 0
+
+
+def write_position(buf, board: Engine) -> None:
+    """Encode *board* into *buf* after the header, one byte per cell."""
+    cols = board.cols
+    for i in range(board.rows):
+        for j in range(cols):
+            buf[_HEADER + i * cols + j] = _CODES[board.get(i, j)]
+
+
+def read_position(buf, rows: int, cols: int, win_len: int) -> BitBoard:
+    x = o = obstacles = 0
+    for idx in range(rows * cols):
+        code = buf[_HEADER + idx]
+        if code == 1:
+            x |= 1 << idx
+        elif code == 2:
+            o |= 1 << idx
+        elif code == 3:
+            obstacles |= 1 << idx
+    return BitBoard.from_masks(rows, cols, win_len, x, o, obstacles)
+
+
+class _SharedFlag:
+    """Quacks like threading.Event for MinimaxAI's cancel check."""
+
+    def __init__(self, buf) -> None:
+        self._buf = buf
+
+    def is_set(self) -> bool:
+        return self._buf[0] != 0
+
+
+# -------- worker side -----------------------------------------------------
+
+_worker_ai: Optional[MinimaxAI] = None
+
+
+def _search_chunk(shm_name: str, rows: int, cols: int, win_len: int,
+                  moves: List[Tuple[int, int]], ai_symbol: str, human_symbol: str,
+                  budget: SearchBudget, radius: int
+                  ) -> Tuple[Tuple[int, int], float, int, Tuple[int, ...]]:
+    global _worker_ai
+    shm = shared_memory.SharedMemory(name=shm_name)
+    try:
+        board = read_position(shm.buf, rows, cols, win_len)
+        if _worker_ai is None:
+            _worker_ai = MinimaxAI("hard")
+        ai = _worker_ai
+        ai.budget, ai.radius = budget, radius
+        ai._cancel = _SharedFlag(shm.buf)
+        move, score = ai.search(board, ai_symbol, human_symbol, root_moves=moves)
+        counters = (ai.nodes, ai.cutoffs, ai.tt_probes, ai.tt_hits,
+                    ai._expanded, ai._children)
+        return move, score, ai.depth_reached, counters
+    finally:
+        # drop every view on shm.buf, or close() refuses to unmap it
+        if _worker_ai is not None:
+            _worker_ai._cancel = None
+        shm.close()
+
+
+# -------- main side -------------------------------------------------------
+
+class ParallelMinimaxAI(MinimaxAI):
+    """MinimaxAI that searches disjoint root-move sets in parallel processes.
+
+    Each worker gets the full budget for its share of the root moves, so
+    on N cores roughly N times as many nodes are searched per move.
+    """
+
+    def __init__(self, difficulty: str = "hard", workers: Optional[int] = None, **kw):
+        super().__init__(difficulty, **kw)
+        self.workers = workers or os.cpu_count() or 1
+
+    def search(self, board: Engine, ai_symbol: str, human_symbol: str,
+               root_moves: Optional[List[Tuple[int, int]]] = None) -> Tuple[Tuple[int, int], float]:
+        if root_moves is None:
+            root_moves = candidate_moves(board, self.radius)
+        workers = min(self.workers, len(root_moves))
+        if workers <= 1:
+            return super().search(board, ai_symbol, human_symbol, root_moves)
+
+        # deal moves round-robin so every worker gets a mix of good and bad
+        chunks = [root_moves[k::workers] for k in range(workers)]
+        shm = shared_memory.SharedMemory(create=True, size=_HEADER + board.rows * board.cols)
+        try:
+            shm.buf[0] = 0
+            write_position(shm.buf, board)
+            pool = _get_executor(workers)
+            futures = [
+                pool.submit(_search_chunk, shm.name, board.rows, board.cols,
+                            board.win_len, chunk, ai_symbol, human_symbol,
+                            self.budget, self.radius)
+                for chunk in chunks
+            ]
+            # pass a cancel of this search's token on to the workers
+            pending = futures
+            while pending:
+                _, pending = wait(pending, timeout=0.02)
+                if self._cancel.is_set():
+                    shm.buf[0] = 1
+            results = [f.result() for f in futures]
+        finally:
+            shm.close()
+            shm.unlink()
+
+        (self.nodes, self.cutoffs, self.tt_probes, self.tt_hits,
+         self._expanded, self._children) = (sum(c) for c in zip(*(r[3] for r in results)))
+        self.depth_reached = min(r[2] for r in results)
+        # prefer the higher score; on ties, the deeper-searched result
+        move, score, _, _ = max(results, key=lambda r: (r[1], r[2]))
+        return move, score
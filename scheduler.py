@@ -0,0 +1,130 @@
+# scheduler.py
+"""Where GameController runs its delayed and background work.
+
+``schedule(delay, cb)`` calls ``cb()`` later on the owner's thread and
+returns a handle with ``cancel()``; ``submit(fn, on_done, on_error)``
+runs ``fn()`` off that thread and hands its result to ``on_done`` back
+on it, or the exception it raised to ``on_error`` (logged if None).
+
+* :class:`KivyScheduler`      – the app: kivy's Clock plus a worker thread.
+* :class:`ImmediateScheduler` – tests and simulations: no threads, no
+  delays; queued work runs when ``run_until_idle()`` is called.
+* :class:`AsyncioScheduler`   – servers: the event loop and an executor.
+"""
+import asyncio
+import logging
+import threading
+from collections import deque
+from concurrent.futures import Executor
+from typing import Any, Callable, Deque, Optional, Protocol, Tuple
+
+logger = logging.getLogger("tictactoe.scheduler")
+ErrorCallback = Optional[Callable[[BaseException], None]]
+
+
+class Cancellable(Protocol):
+    def cancel(self) -> Any: ...
+
+
+class Scheduler(Protocol):
+    def schedule(self, delay: float, callback: Callable[[], None]) -> Cancellable: ...
+    def submit(self, fn: Callable[[], Any], on_done: Callable[[Any], None],
+               on_error: ErrorCallback = None) -> None: ...
+
+
+def _outcome(fn: Callable[[], Any]) -> Tuple[Any, Optional[BaseException]]:
+    try:
+        return fn(), None
+    except Exception as exc:
+        return None, exc
+
+
+def _deliver(result: Any, exc: Optional[BaseException],
+             on_done: Callable[[Any], None], on_error: ErrorCallback) -> None:
+    if exc is None:
+        on_done(result)
+    elif on_error is not None:
+        on_error(exc)
+    else:
+        logger.error("background task failed", exc_info=exc)
+
+
+class KivyScheduler:
+    """Clock callbacks on the UI thread; ``submit`` work on a daemon thread."""
+
+    def __init__(self) -> None:
+        # imported here so the controller itself never pulls in kivy
+        from kivy.clock import Clock
+        self._clock = Clock
+
+    def schedule(self, delay: float, callback: Callable[[], None]) -> Cancellable:
+        return self._clock.schedule_once(lambda dt: callback(), delay)
+
+    def submit(self, fn: Callable[[], Any], on_done: Callable[[Any], None],
+               on_error: ErrorCallback = None) -> None:
+        def work() -> None:
+            result, exc = _outcome(fn)
+            self._clock.schedule_once(lambda dt: _deliver(result, exc, on_done, on_error))
+        threading.Thread(target=work, daemon=True).start()
+
+
+class _Call:
+    __slots__ = ("callback", "cancelled")
+
+    def __init__(self, callback: Callable[[], None]) -> None:
+        self.callback = callback
+        self.cancelled = False
+
+    def cancel(self) -> None:
+        self.cancelled = True
+
+
+class ImmediateScheduler:
+    """Synchronous: delays are ignored and work runs in the calling thread.
+
+    Nothing runs inside ``schedule``/``submit`` themselves (so callers
+    finish their own bookkeeping first); ``run_until_idle`` drains the
+    queue, including whatever the callbacks queue in turn.
+    """
+
+    def __init__(self) -> None:
+        self._queue: Deque[_Call] = deque()
+
+    def schedule(self, delay: float, callback: Callable[[], None]) -> Cancellable:
+        call = _Call(callback)
+        self._queue.append(call)
+        return call
+
+    def submit(self, fn: Callable[[], Any], on_done: Callable[[Any], None],
+               on_error: ErrorCallback = None) -> None:
+        self._queue.append(_Call(lambda: _deliver(*_outcome(fn), on_done, on_error)))
+
+    def run_until_idle(self) -> int:
+        """Run queued callbacks until none are left; returns how many ran."""
+        ran = 0
+        while self._queue:
+            call = self._queue.popleft()
+            if not call.cancelled:
+                call.callback()
+                ran += 1
+        return ran
+
+
+class AsyncioScheduler:
+    """Timers on an event loop; ``submit`` work in *executor* (default pool)."""
+
+    def __init__(self, loop: Optional[asyncio.AbstractEventLoop] = None,
+                 executor: Optional[Executor] = None) -> None:
+        self._loop = loop or asyncio.get_running_loop()
+        self._executor = executor
+
+    def schedule(self, delay: float, callback: Callable[[], None]) -> Cancellable:
+        return self._loop.call_later(delay, callback)
+
+    def submit(self, fn: Callable[[], Any], on_done: Callable[[Any], None],
+               on_error: ErrorCallback = None) -> None:
+        def done(future: asyncio.Future) -> None:
+            if not future.cancelled():
+                exc = future.exception()
+                _deliver(None if exc else future.result(), exc, on_done, on_error)
+        self._loop.run_in_executor(self._executor, fn).add_done_callback(done)
@@ -0,0 +1,39 @@
+# search_stats.py
+import json
+import logging
+from dataclasses import asdict, dataclass, field
+from typing import List, Optional, Tuple
+
+# Structured per-move log; silent unless the app enables INFO for it.
+logger = logging.getLogger("tictactoe.search")
+
+
+@dataclass
+class SearchStats:
+    """What one AI move cost and what the search saw."""
+
+    move: Optional[Tuple[int, int]] = None
+    source: str = "search"        # search / book / tablebase / threat / random / mcts
+    score: Optional[float] = None
+    nodes: int = 0
+    cutoffs: int = 0
+    tt_probes: int = 0
+    tt_hits: int = 0
+    depth_reached: int = 0
+    branching: float = 0.0        # children searched per expanded node
+    elapsed: float = 0.0          # seconds
+    pv: List[Tuple[int, int]] = field(default_factory=list)
+
+    @property
+    def nodes_per_second(self) -> float:
+        return self.nodes / self.elapsed if self.elapsed else 0.0
+
+    def to_json(self) -> str:
+        data = asdict(self)
+        data["nodes_per_second"] = round(self.nodes_per_second)
+        return json.dumps(data)
+
+
+def log_stats(stats: SearchStats) -> None:
+    if logger.isEnabledFor(logging.INFO):
+        logger.info(stats.to_json())
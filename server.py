@@ -0,0 +1,370 @@
+# server.py
+"""Headless game server: JSON lines over TCP, many games per process.
+
+    python server.py --port 8765 --workers 4 --record games.ttr
+
+Every request is one JSON object per line and gets exactly one reply
+line carrying the same ``id``; game events are pushed as extra lines.
+
+    {"id": 1, "op": "new", "rows": 9, "cols": 9, "win_len": 5,
+     "obstacles": 6, "seed": 42, "mode": "bot", "difficulty": "hard"}
+    {"id": 2, "op": "play", "session": 1, "row": 4, "col": 4}
+    {"id": 3, "op": "state", "session": 1}
+    {"id": 4, "op": "close", "session": 1}
+    {"id": 5, "op": "stats"}
+
+Events: ``{"event": "board", "session", "row", "col", "symbol"}`` and
+``{"event": "state", "session", "state", "turn"}``; a session whose bot
+cannot move gets ``{"event": "error", "session", "error", "closed": true}``
+and is closed.
+
+Each session is a ``Board`` driven by a ``GameController`` in friend
+mode; the server plays the bot's side itself.  Bot moves run in a
+process pool, at most ``--max-pending`` at a time, so a slow search
+never blocks the event loop.  A connection waiting for a pool slot
+stops reading, and replies wait for the socket to drain, so a busy
+server or a slow client pushes back instead of queueing without bound.
+Sessions are admitted against ``--max-sessions`` and a memory budget
+that sums each board's measured footprint.  With ``--record`` every
+game is appended to a binary record file (see game_record.py).
+"""
+import argparse
+import asyncio
+import functools
+import itertools
+import json
+import sys
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, List, Optional, Tuple
+
+from board import Board
+from controller import GameController, GameState
+from game_record import GameRecorder, GameWriter
+from minimax import BUDGETS, MinimaxAI
+from scheduler import AsyncioScheduler
+
+MAX_LINE = 64 * 1024          # longest request line accepted
+MAX_CELLS = 32 * 32
+MAX_SEED = (1 << 63) - 1
+
+# -------- bot moves (run in worker processes) -----------------------------
+
+# one AI per difficulty and worker, so its transposition table is reused
+_worker_ais: Dict[str, MinimaxAI] = {}
+
+
+def _bot_move(grid: List[List[str]], win_len: int, difficulty: str,
+              ai_symbol: str, human_symbol: str) -> Optional[Tuple[int, int]]:
+    ai = _worker_ais.get(difficulty)
+    if ai is None:
+        ai = _worker_ais[difficulty] = MinimaxAI(difficulty)
+    return ai.get_best_move(Board.from_grid(grid, win_len), ai_symbol, human_symbol)
+
+
+# -------- request fields --------------------------------------------------
+
+def _int_field(req: Dict, key: str, default: Optional[int], lo: int, hi: int) -> int:
+    """``req[key]`` as an int in [lo, hi]; floats, strings and bools are refused."""
+    value = req.get(key, default)
+    if not isinstance(value, int) or isinstance(value, bool):
+        raise ValueError(f"{key} must be an integer")
+    if not lo <= value <= hi:
+        raise ValueError(f"{key} must be in {lo}..{hi}")
+    return value
+
+
+# -------- sessions --------------------------------------------------------
+
+class Session:
+    """One game: board, controller and the connection its events go to."""
+
+    def __init__(self, sid: int, conn: "Connection", board: Board,
+                 mode: str, difficulty: str, bot: str) -> None:
+        self.sid = sid
+        self.conn = conn
+        self.board = board
+        self.mode = mode
+        self.difficulty = difficulty
+        self.bot = bot if mode == "bot" else None
+        self.turn: Optional[str] = "X"
+        self.state = GameState.IN_PROGRESS
+        self.thinking = False
+        self.footprint = 0
+        self.recorder: Optional[GameRecorder] = None
+        # friend mode never schedules; the loop scheduler keeps kivy out
+        self.controller = GameController(board, "friend", scheduler=AsyncioScheduler())
+        self.controller.register(self)
+
+    # GameObserver
+    def on_board_change(self, coords: Tuple[int, int], symbol: str) -> None:
+        self.conn.push({"event": "board", "session": self.sid,
+                        "row": coords[0], "col": coords[1], "symbol": symbol})
+
+    def on_state_change(self, state: GameState, next_turn: Optional[str]) -> None:
+        self.state, self.turn = state, next_turn
+        self.conn.push({"event": "state", "session": self.sid,
+                        "state": state.name, "turn": next_turn})
+
+    def snapshot(self) -> Dict[str, object]:
+        return {"session": self.sid, "rows": self.board.rows, "cols": self.board.cols,
+                "win_len": self.board.win_len,
+                "grid": ["".join(row) for row in self.board.grid()],
+                "state": self.state.name, "turn": self.turn, "bot": self.bot}
+
+    @property
+    def bot_to_move(self) -> bool:
+        return (self.bot is not None and self.state is GameState.IN_PROGRESS
+                and self.turn == self.bot)
+
+
+class GameServer:
+    """Session registry, admission control and the bot worker pool."""
+
+    def __init__(self, workers: int = 2, max_pending: int = 32,
+                 max_sessions: int = 10_000, max_memory: int = 256 << 20,
+                 record: Optional[GameWriter] = None) -> None:
+        self.executor = ProcessPoolExecutor(max_workers=workers)
+        self.slots = asyncio.Semaphore(max_pending)
+        self.max_sessions = max_sessions
+        self.max_memory = max_memory
+        self.sessions: Dict[int, Session] = {}
+        self.memory = 0
+        self.pending = 0
+        self.record = record
+        self._ids = itertools.count(1)
+
+    # -------- session lifecycle -------------------------------------------
+
+    async def open(self, conn: "Connection", req: Dict) -> Session:
+        rows = _int_field(req, "rows", 5, 1, MAX_CELLS)
+        cols = _int_field(req, "cols", rows, 1, MAX_CELLS)
+        if not 3 <= rows * cols <= MAX_CELLS:
+            raise ValueError(f"board must have 3..{MAX_CELLS} cells")
+        win_len = _int_field(req, "win_len", min(rows, cols, 4), 1, max(rows, cols))
+        obstacles = _int_field(req, "obstacles", 0, 0, rows * cols)
+        min_open_lines = _int_field(req, "min_open_lines", 0, 0, 4 * rows * cols)
+        seed = None if req.get("seed") is None else _int_field(req, "seed", None, 0, MAX_SEED)
+        mode = req.get("mode", "friend")
+        bot = req.get("bot", "O")
+        if bot not in ("X", "O"):
+            raise ValueError("bot must be 'X' or 'O'")
+        difficulty = req.get("difficulty", "medium")
+        if mode not in ("friend", "bot"):
+            raise ValueError("mode must be 'friend' or 'bot'")
+        if difficulty not in BUDGETS:
+            raise ValueError(f"difficulty must be one of {sorted(BUDGETS)}")
+        if len(self.sessions) >= self.max_sessions:
+            raise ValueError("server full: too many sessions")
+        # redrawing layouts for min_open_lines can take a while (up to
+        # MAX_LAYOUT_TRIES passes over every line): keep it off the loop
+        board = await asyncio.get_running_loop().run_in_executor(None, functools.partial(
+            Board, rows, cols, win_len, obstacles, seed=seed, min_open_lines=min_open_lines))
+        if len(self.sessions) >= self.max_sessions:      # others opened meanwhile
+            raise ValueError("server full: too many sessions")
+        footprint = board.footprint
+        if self.memory + footprint > self.max_memory:
+            raise ValueError("server full: memory budget exhausted")
+        session = Session(next(self._ids), conn, board, mode, difficulty, bot)
+        session.footprint = footprint
+        if self.record is not None:
+            session.recorder = GameRecorder(self.record, session.controller)
+        self.memory += footprint
+        self.sessions[session.sid] = session
+        conn.sessions[session.sid] = session
+        await self._maybe_bot(session)      # the bot may have the first move
+        return session
+
+    def close(self, session: Session) -> None:
+        if self.sessions.pop(session.sid, None) is not None:
+            self.memory -= session.footprint
+            session.conn.sessions.pop(session.sid, None)
+            if session.recorder is not None:
+                session.recorder.close()
+
+    def _remeasure(self, session: Session) -> None:
+        footprint = session.board.footprint          # O(1) after the first call
+        self.memory += footprint - session.footprint
+        session.footprint = footprint
+
+    # -------- moves -------------------------------------------------------
+
+    async def play(self, session: Session, i: int, j: int) -> None:
+        if session.state is not GameState.IN_PROGRESS:
+            raise ValueError("game is over")
+        if session.bot_to_move or session.thinking:
+            raise ValueError("not your turn")
+        if not (0 <= i < session.board.rows and 0 <= j < session.board.cols) \
+                or not session.board.is_empty(i, j):
+            raise ValueError("illegal move")
+        session.controller.play(i, j)
+        self._remeasure(session)
+        await self._maybe_bot(session)
+
+    async def _maybe_bot(self, session: Session) -> None:
+        """Hand the bot's turn to the pool.
+
+        Waiting for a free slot happens here, on the requesting client's
+        read loop, so a saturated pool stops that client from sending
+        more work rather than growing a queue.
+        """
+        if not session.bot_to_move:
+            return
+        session.thinking = True
+        await self.slots.acquire()
+        self.pending += 1
+        asyncio.get_running_loop().create_task(self._bot_turn(session))
+
+    async def _bot_turn(self, session: Session) -> None:
+        """Search in the pool, then play the move if the session still exists."""
+        bot = session.bot
+        human = "X" if bot == "O" else "O"
+        move, error = None, None
+        try:
+            move = await asyncio.get_running_loop().run_in_executor(
+                self.executor, _bot_move, session.board.grid(),
+                session.board.win_len, session.difficulty, bot, human)
+        except Exception as exc:          # broken pool etc.: report, keep serving
+            error = repr(exc)
+        finally:
+            self.pending -= 1
+            self.slots.release()
+            session.thinking = False
+        if session.sid not in self.sessions or not session.bot_to_move:
+            return
+        if move is None:
+            # the bot cannot move, so the game can never continue: end it
+            session.conn.push({"event": "error", "session": session.sid,
+                               "error": error or "bot found no move", "closed": True})
+            self.close(session)
+            return
+        session.controller.play(*move)
+        self._remeasure(session)
+
+    def stats(self) -> Dict[str, int]:
+        return {"sessions": len(self.sessions), "memory": self.memory,
+                "max_memory": self.max_memory, "pending_bot_moves": self.pending}
+
+    def shutdown(self) -> None:
+        self.executor.shutdown(wait=False, cancel_futures=True)
+        if self.record is not None:
+            for session in list(self.sessions.values()):
+                self.close(session)         # writes the games still running
+            self.record.close()
+
+
+# -------- connections -----------------------------------------------------
+
+class Connection:
+    """One client socket; owns the sessions it opened."""
+
+    def __init__(self, server: GameServer, reader: asyncio.StreamReader,
+                 writer: asyncio.StreamWriter) -> None:
+        self.server = server
+        self.reader = reader
+        self.writer = writer
+        self.sessions: Dict[int, Session] = {}
+
+    def push(self, message: Dict) -> None:
+        """Queue one line; ``flush`` applies the backpressure."""
+        if not self.writer.is_closing():
+            self.writer.write(json.dumps(message).encode() + b"\n")
+
+    async def flush(self) -> None:
+        await self.writer.drain()
+
+    async def serve(self) -> None:
+        try:
+            while True:
+                try:
+                    line = await self.reader.readline()
+                except (asyncio.LimitOverrunError, ValueError):
+                    self.push({"ok": False, "error": "line too long"})
+                    break
+                if not line:
+                    break
+                self.push(await self.handle(line))
+                await self.flush()          # slow reader: stop taking requests
+        except ConnectionError:
+            pass
+        finally:
+            for session in list(self.sessions.values()):
+                self.server.close(session)
+            self.writer.close()
+
+    async def handle(self, line: bytes) -> Dict:
+        req: Dict = {}
+        try:
+            req = json.loads(line)
+            if not isinstance(req, dict):
+                raise ValueError("request must be a JSON object")
+            reply = await self._dispatch(req)
+        except (ValueError, KeyError, TypeError, OverflowError) as exc:
+            reply = {"ok": False, "error": str(exc) or type(exc).__name__}
+        if "id" in req:
+            reply["id"] = req["id"]
+        return reply
+
+    async def _dispatch(self, req: Dict) -> Dict:
+        op = req.get("op")
+        if op == "stats":
+            return {"ok": True, **self.server.stats()}
+        if op == "new":
+            session = await self.server.open(self, req)
+            return {"ok": True, **session.snapshot()}
+        session = self.sessions.get(_int_field(req, "session", 0, 0, MAX_SEED))
+        if session is None:
+            raise ValueError("no such session")
+        if op == "play":
+            await self.server.play(session, _int_field(req, "row", None, 0, MAX_CELLS),
+                                   _int_field(req, "col", None, 0, MAX_CELLS))
+            return {"ok": True}
+        if op == "state":
+            return {"ok": True, **session.snapshot()}
+        if op == "close":
+            self.server.close(session)
+            return {"ok": True}
+        raise ValueError(f"unknown op {op!r}")
+
+
+async def serve(host: str, port: int, server: GameServer) -> None:
+    async def on_client(reader, writer):
+        await Connection(server, reader, writer).serve()
+
+    tcp = await asyncio.start_server(on_client, host, port, limit=MAX_LINE)
+    addrs = ", ".join(str(s.getsockname()) for s in tcp.sockets)
+    print(f"serving on {addrs}", flush=True)
+    try:
+        async with tcp:
+            await tcp.serve_forever()
+    finally:
+        server.shutdown()
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    p = argparse.ArgumentParser(description="Headless JSON-lines game server.")
+    p.add_argument("--host", default="127.0.0.1")
+    p.add_argument("--port", type=int, default=8765)
+    p.add_argument("--workers", type=int, default=2, help="bot search processes")
+    p.add_argument("--max-pending", type=int, default=32,
+                   help="bot moves searched or queued at once")
+    p.add_argument("--max-sessions", type=int, default=10_000)
+    p.add_argument("--max-memory-mb", type=int, default=256,
+                   help="budget for the summed board footprints")
+    p.add_argument("--record", help="append every game to this record file")
+    args = p.parse_args(argv)
+
+    async def run() -> None:
+        server = GameServer(args.workers, args.max_pending, args.max_sessions,
+                            args.max_memory_mb << 20,
+                            GameWriter(args.record, append=True) if args.record else None)
+        await serve(args.host, args.port, server)
+
+    try:
+        asyncio.run(run())
+    except KeyboardInterrupt:
+        pass
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,28 +1,123 @@
+# sound_manager.py
+import os
+import threading
+from typing import Dict, List, Optional
+
+from kivy.clock import Clock
 from kivy.core.audio import SoundLoader
 
-class SoundManager:
-    """Load & reuse background / SFX once."""
-    def __init__(self):
-        self.bg   = SoundLoader.load("sounds/bg_music.ogg")
-        self.tap  = SoundLoader.load("sounds/click.wav")
-        self.win  = SoundLoader.load("sounds/win.wav")
-        self.draw = SoundLoader.load("sounds/draw.wav")
+SOUND_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "sounds")
+EFFECTS = {"tap": "click.wav", "win": "win.wav", "draw": "draw.wav"}
+MUSIC = "bg_music.ogg"
+VOICES = {"tap": 4, "win": 1, "draw": 1}   # overlapping copies per effect
+VOLUME = .4
 
-        for s in (self.bg, self.tap, self.win, self.draw):
-            if s:
-                s.volume = .4
 
-        if self.bg:
-            self.bg.loop = True
-            self.bg.play()
+class AudioService:
+    """Process-wide sounds: decoded once, shared by games.
+
+    Each effect owns a few voices (separate Sound objects) so a quick tap
+    plays on a free voice instead of cutting off the previous one.  Files
+    that are missing are skipped, and until loading finishes the play_*
+    helpers are silent no-ops.
+
+    Kivy's audio providers are not thread-safe, so only the file reads
+    happen on a background thread; the Sound objects are built (one file
+    per frame) and played on the main thread.
+    """
 
-    # helper wrappers --------------------------------------------------
-    def play_tap(self):   self._safe(self.tap)
-    def play_win(self):   self._safe(self.win)
-    def play_draw(self):  self._safe(self.draw)
+    def __init__(self) -> None:
+        self._voices: Dict[str, List] = {}
+        self._next: Dict[str, int] = {}
+        self.bg = None
+        self._loader: Optional[threading.Thread] = None
+        self._music_wanted = False
+
+    # -------- loading -----------------------------------------------------
+    def preload(self, music: bool = True) -> None:
+        """Start loading every sound in the background (once)."""
+        self._music_wanted = music
+        if self._loader is None:
+            self._loader = threading.Thread(target=self._read_files, daemon=True)
+            self._loader.start()
+
+    def _read_files(self) -> None:
+        """Background: plain file I/O only (no kivy, no Java), warming the
+        OS cache so building the sounds on the main thread is quick."""
+        found = []
+        for filename in (*EFFECTS.values(), MUSIC):
+            path = os.path.join(SOUND_DIR, filename)
+            if not os.path.exists(path):
+                continue
+            with open(path, "rb") as f:
+                while f.read(1 << 16):
+                    pass
+            found.append(filename)
+        pending = [(name, f) for name, f in EFFECTS.items() if f in found]
+        if MUSIC in found:
+            pending.append((None, MUSIC))
+        Clock.schedule_once(lambda dt: self._build(pending))   # thread-safe
+
+    def _build(self, pending: List) -> None:
+        """Main thread: create the Sound objects for one file per frame."""
+        if not pending:
+            return
+        name, filename = pending.pop(0)
+        if name is not None:
+            voices = [s for s in (self._load(filename) for _ in range(VOICES[name])) if s]
+            self._next[name] = 0
+            self._voices[name] = voices
+        else:
+            bg = self._load(filename)
+            if bg:
+                bg.loop = True
+                self.bg = bg
+                if self._music_wanted:
+                    bg.play()
+        if pending:
+            Clock.schedule_once(lambda dt: self._build(pending))
 
     @staticmethod
-    def _safe(snd):
-        if snd:
-            snd.stop()
-            snd.play()
+    def _load(filename: str):
+        path = os.path.join(SOUND_DIR, filename)
+        if not os.path.exists(path):
+            return None
+        sound = SoundLoader.load(path)
+        if sound:
+            sound.volume = VOLUME
+        return sound
+
+    # -------- playback ----------------------------------------------------
+    def play_tap(self):   self._play("tap")
+    def play_win(self):   self._play("win")
+    def play_draw(self):  self._play("draw")
+
+    def _play(self, name: str) -> None:
+        voices = self._voices.get(name)
+        if not voices:
+            return
+        for voice in voices:
+            if voice.state != "play":
+                voice.play()
+                return
+        # every voice busy: restart the one that started longest ago
+        k = self._next[name]
+        self._next[name] = (k + 1) % len(voices)
+        voices[k].stop()
+        voices[k].play()
+
+    def stop_music(self) -> None:
+        self._music_wanted = False
+        if self.bg:
+            self.bg.stop()
+
+
+_service: Optional[AudioService] = None
+
+
+def get_audio() -> AudioService:
+    """The shared AudioService (created on first use, not loaded yet)."""
+    global _service
+    if _service is None:
+        _service = AudioService()
+    return _service
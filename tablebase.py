@@ -0,0 +1,267 @@
+# tablebase.py
+"""Perfect-play tablebases for small obstacle-free boards.
+
+Build offline, e.g.::
+
+    python tablebase.py                          # every SETTINGS entry
+    python tablebase.py --rows 4 --cols 4 --win-len 3
+
+The solver walks every reachable position, folds the board symmetries
+into one canonical key and records win/loss/draw for the side to move
+with the distance (in plies) to the end of the game under perfect play.
+Files are open-addressed hash tables of ``(key u32, value u8)`` slots,
+memory-mapped on first use, so a probe is O(1).
+"""
+import argparse
+import mmap
+import os
+import struct
+import sys
+import time
+from functools import lru_cache
+from typing import Dict, List, Optional, Tuple
+
+from board import Board
+
+TB_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "tablebases")
+SETTINGS = [(3, 3, 3), (4, 4, 3), (4, 4, 4)]
+
+WIN, LOSS, DRAW = 1, 2, 3            # for the side to move
+_MAGIC = b"TTTT"
+_HEADER = struct.Struct("<4sBBBBII")  # magic, version, rows, cols, win_len, capacity, count
+_SLOT = struct.Struct("<IB")          # canonical key, value (0 = free slot)
+_VERSION = 1
+_CODE = {Board.EMPTY: 0, "X": 1, "O": 2}
+
+
+def tablebase_path(rows: int, cols: int, win_len: int) -> str:
+    return os.path.join(TB_DIR, f"tb_{rows}x{cols}_{win_len}.bin")
+
+
+def pack_value(result: int, distance: int) -> int:
+    return result << 6 | distance
+
+
+def unpack_value(value: int) -> Tuple[int, int]:
+    return value >> 6, value & 63
+
+
+@lru_cache(maxsize=None)
+def symmetries(rows: int, cols: int) -> Tuple[Tuple[int, ...], ...]:
+    """Cell permutations of the board's symmetry group (8 square, 4 otherwise).
+
+    ``perm[idx]`` is where cell *idx* lands under the transform.
+    """
+    maps = [
+        lambda i, j: (i, j),
+        lambda i, j: (i, cols - 1 - j),
+        lambda i, j: (rows - 1 - i, j),
+        lambda i, j: (rows - 1 - i, cols - 1 - j),
+    ]
+    if rows == cols:
+        n = rows - 1
+        maps += [
+            lambda i, j: (j, i),
+            lambda i, j: (n - j, i),
+            lambda i, j: (j, n - i),
+            lambda i, j: (n - j, n - i),
+        ]
+    perms = []
+    for f in maps:
+        perm = []
+        for idx in range(rows * cols):
+            ti, tj = f(*divmod(idx, cols))
+            perm.append(ti * cols + tj)
+        perms.append(tuple(perm))
+    return tuple(perms)
+
+
+def _slot(key: int, mask: int) -> int:
+    return (key * 2654435761) & mask
+
+
+class Tablebase:
+    """Read-only, memory-mapped tablebase for one (rows, cols, win_len)."""
+
+    def __init__(self, path: str) -> None:
+        with open(path, "rb") as f:
+            self._mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, version, self.rows, self.cols, self.win_len, capacity, self._count = \
+            _HEADER.unpack_from(self._mm, 0)
+        if magic != _MAGIC or version != _VERSION:
+            raise ValueError(f"{path}: not a tablebase (v{_VERSION})")
+        self._mask = capacity - 1
+        self._perms = symmetries(self.rows, self.cols)
+        self._pow3 = [3 ** k for k in range(self.rows * self.cols)]
+
+    def __len__(self) -> int:
+        return self._count
+
+    def key(self, board) -> int:
+        """Canonical key of *board*: the smallest base-3 code over symmetries."""
+        cells = [
+            _CODE[board.get(i, j)] for i in range(self.rows) for j in range(self.cols)
+        ]
+        pow3 = self._pow3
+        return min(
+            sum(c * pow3[perm[idx]] for idx, c in enumerate(cells) if c)
+            for perm in self._perms
+        )
+
+    def probe_key(self, key: int) -> Optional[Tuple[int, int]]:
+        mm, base, size, mask = self._mm, _HEADER.size, _SLOT.size, self._mask
+        slot = _slot(key, mask)
+        while True:
+            k, value = _SLOT.unpack_from(mm, base + slot * size)
+            if not value:
+                return None
+            if k == key:
+                return unpack_value(value)
+            slot = (slot + 1) & mask
+
+    def probe(self, board) -> Optional[Tuple[int, int]]:
+        """(result, distance) for the side to move, or None if unknown."""
+        return self.probe_key(self.key(board))
+
+    def best_move(self, board, symbol: str) -> Optional[Tuple[int, int]]:
+        """Perfect move for *symbol*: fastest win, else draw, else slowest loss."""
+        best, best_rank = None, None
+        for i, j in board.legal_moves():
+            board.make_move(i, j, symbol)
+            try:
+                if board.winner == symbol:
+                    return i, j
+                if board.is_full():
+                    rank = (1, 0)
+                else:
+                    entry = self.probe(board)
+                    if entry is None:
+                        return None  # position outside this table
+                    result, dist = entry  # from the opponent's side
+                    if result == LOSS:
+                        rank = (2, -dist)
+                    elif result == DRAW:
+                        rank = (1, 0)
+                    else:
+                        rank = (0, dist)
+            finally:
+                board.unmake_move()
+            if best_rank is None or rank > best_rank:
+                best, best_rank = (i, j), rank
+        return best
+
+
+@lru_cache(maxsize=None)
+def load_tablebase(rows: int, cols: int, win_len: int) -> Optional[Tablebase]:
+    """The tablebase for this setting, or None if none was built."""
+    path = tablebase_path(rows, cols, win_len)
+    if not os.path.exists(path):
+        return None
+    return Tablebase(path)
+
+
+# -------- offline solver --------------------------------------------------
+
+def solve(rows: int, cols: int, win_len: int) -> Dict[int, int]:
+    """Canonical key -> packed value for every reachable non-final position."""
+    if rows * cols > 20:
+        raise ValueError("keys are 32-bit: at most 20 cells")
+    board = Board(rows, cols, win_len, num_obstacles=0)
+    perms = symmetries(rows, cols)
+    # one running base-3 code per symmetry, updated on every move
+    weights = [[3 ** perm[idx] for perm in perms] for idx in range(rows * cols)]
+    codes = [0] * len(perms)
+    table: Dict[int, int] = {}
+
+    def search(turn: str) -> int:
+        key = min(codes)
+        value = table.get(key)
+        if value is not None:
+            return value
+        other = "O" if turn == "X" else "X"
+        digit = _CODE[turn]
+        best_win = best_draw = None
+        worst_loss = -1
+        for i, j in board.legal_moves():
+            idx = i * cols + j
+            w = weights[idx]
+            board.make_move(i, j, turn)
+            for t in range(len(codes)):
+                codes[t] += digit * w[t]
+            if board.winner == turn:
+                child = pack_value(LOSS, 0)
+            elif board.is_full():
+                child = pack_value(DRAW, 0)
+            else:
+                child = search(other)
+            for t in range(len(codes)):
+                codes[t] -= digit * w[t]
+            board.unmake_move()
+
+            result, dist = unpack_value(child)
+            if result == LOSS:
+                if best_win is None or dist < best_win:
+                    best_win = dist
+            elif result == DRAW:
+                if best_draw is None or dist < best_draw:
+                    best_draw = dist
+            else:
+                worst_loss = max(worst_loss, dist)
+
+        if best_win is not None:
+            value = pack_value(WIN, best_win + 1)
+        elif best_draw is not None:
+            value = pack_value(DRAW, best_draw + 1)
+        else:
+            value = pack_value(LOSS, worst_loss + 1)
+        table[key] = value
+        return value
+
+    search("X")
+    return table
+
+
+def write_tablebase(path: str, rows: int, cols: int, win_len: int,
+                    table: Dict[int, int]) -> None:
+    capacity = 1 << max(1, (2 * len(table) - 1).bit_length())  # load ≤ 50%
+    mask = capacity - 1
+    slots = bytearray(capacity * _SLOT.size)
+    used = bytearray(capacity)
+    for key, value in table.items():
+        slot = _slot(key, mask)
+        while used[slot]:
+            slot = (slot + 1) & mask
+        used[slot] = 1
+        _SLOT.pack_into(slots, slot * _SLOT.size, key, value)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, "wb") as f:
+        f.write(_HEADER.pack(_MAGIC, _VERSION, rows, cols, win_len, capacity, len(table)))
+        f.write(slots)
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    p = argparse.ArgumentParser(description="Build perfect-play tablebases.")
+    p.add_argument("--rows", type=int)
+    p.add_argument("--cols", type=int)
+    p.add_argument("--win-len", type=int)
+    args = p.parse_args(argv)
+
+    if args.rows:
+        settings = [(args.rows, args.cols or args.rows, args.win_len or args.rows)]
+    else:
+        settings = SETTINGS
+    sys.setrecursionlimit(10_000)
+    for rows, cols, win_len in settings:
+        start = time.perf_counter()
+        table = solve(rows, cols, win_len)
+        path = tablebase_path(rows, cols, win_len)
+        write_tablebase(path, rows, cols, win_len, table)
+        result, dist = unpack_value(table[0])
+        name = {WIN: "first player wins", LOSS: "second player wins", DRAW: "draw"}[result]
+        print(f"{rows}x{cols}, {win_len} in a row: {len(table)} positions, "
+              f"{name} in {dist} plies ({time.perf_counter() - start:.1f}s) -> {path}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,178 @@
+"""Round-trips of the on-disk formats: opening book, tablebase, game records."""
+import os
+import shutil
+
+import pytest
+
+from board import Board
+from game_record import (
+    DRAW, O_WON, UNFINISHED, X_WON, GameReader, GameWriter, decode_game, encode_game,
+)
+from opening_book import OpeningBook, write_book
+from tablebase import DRAW as TB_DRAW, LOSS, WIN, Tablebase, solve, write_tablebase
+
+
+# -------- opening book ------------------------------------------------------
+
+def test_book_round_trip(tmp_path):
+    entries = {key: divmod(key % 63, 9) for key in (3, 1 << 40, 7, (1 << 64) - 1, 12345)}
+    path = str(tmp_path / "books" / "book.bin")
+    write_book(path, 7, 9, 4, entries)
+    book = OpeningBook(path)
+    assert (book.rows, book.cols, book.win_len, len(book)) == (7, 9, 4, len(entries))
+    for key, move in entries.items():
+        assert book.lookup(key) == move
+    assert book.lookup(4) is None
+    assert book.lookup(0) is None
+
+
+def test_book_rejects_other_files(tmp_path):
+    path = tmp_path / "junk.bin"
+    path.write_bytes(b"\0" * 64)
+    with pytest.raises(ValueError):
+        OpeningBook(str(path))
+
+
+# -------- tablebase ---------------------------------------------------------
+
+@pytest.fixture(scope="module")
+def tb_3x3(tmp_path_factory):
+    table = solve(3, 3, 3)
+    path = str(tmp_path_factory.mktemp("tb") / "tb_3x3_3.bin")
+    write_tablebase(path, 3, 3, 3, table)
+    return table, Tablebase(path)
+
+
+def test_tablebase_round_trip(tb_3x3):
+    table, tb = tb_3x3
+    assert len(tb) == len(table)
+    for key, value in table.items():
+        assert tb.probe_key(key) is not None
+        assert tb.probe_key(key) == (value >> 6, value & 63)
+
+
+def test_tablebase_values(tb_3x3):
+    _, tb = tb_3x3
+    board = Board(3, 3, 3, num_obstacles=0)
+    assert tb.probe(board) == (TB_DRAW, 9)          # tic-tac-toe is a draw
+
+    # X to move with two open twos wins at once
+    board = Board.from_grid([["X", "O", "."], ["O", "X", "."], [".", ".", "."]], 3)
+    result, dist = tb.probe(board)
+    assert (result, dist) == (WIN, 1)
+    assert tb.best_move(board, "X") == (2, 2)
+
+    # ... and a rotated copy maps to the same canonical key
+    rotated = Board.from_grid([[".", "O", "X"], [".", "X", "O"], [".", ".", "."]], 3)
+    assert tb.key(rotated) == tb.key(board)
+
+    # O to move against a double threat is lost
+    board = Board.from_grid([["X", ".", "O"], [".", "O", "."], ["X", ".", "X"]], 3)
+    result, _ = tb.probe(board)
+    assert result == LOSS
+
+
+# -------- game records ------------------------------------------------------
+
+GAMES = [
+    (5, 5, 4, (), [(2, 2), (1, 1), (2, 3), (0, 0)], UNFINISHED),
+    (3, 3, 3, (), [(0, 0), (1, 0), (1, 1), (2, 0), (2, 2)], X_WON),
+    (9, 9, 5, (0, 41, 80), [(4, 3), (4, 4), (3, 3)], O_WON),
+    (20, 20, 5, (399,), [(i, 19 - i) for i in range(19)], DRAW),
+]
+
+
+def write_games(path: str, games=GAMES) -> None:
+    with GameWriter(path) as writer:
+        for game in games:
+            writer.add_game(*game)
+
+
+def assert_game(record, game) -> None:
+    rows, cols, win_len, obstacles, moves, result = game
+    assert (record.rows, record.cols, record.win_len) == (rows, cols, win_len)
+    assert record.obstacles == tuple(sorted(obstacles))
+    assert record.moves == moves
+    assert record.plies == len(moves)
+    assert record.result == result
+
+
+def test_encode_decode():
+    for game in GAMES:
+        block = encode_game(*game)
+        record, end = decode_game(block, 0)
+        assert end == len(block)
+        assert_game(record, game)
+    # one byte per move on boards up to 128 cells
+    assert len(encode_game(5, 5, 4, (), [(0, 0)] * 10, UNFINISHED)) == 6 + 10
+
+
+def test_record_file_round_trip(tmp_path):
+    path = str(tmp_path / "games.ttr")
+    write_games(path)
+    with GameReader(path) as reader:
+        assert len(reader) == len(GAMES)
+        for n, game in enumerate(GAMES):
+            assert_game(reader[n], game)
+        assert [r.winner for r in reader] == ["unfinished", "X", "O", "draw"]
+
+
+def test_position_decodes_prefix(tmp_path):
+    path = str(tmp_path / "games.ttr")
+    write_games(path)
+    with GameReader(path) as reader:
+        board = reader.position(2, 2)
+        assert board.move_count == 2
+        assert board.get(4, 3) == "X" and board.get(4, 4) == "O"
+        assert board.get(3, 3) == Board.EMPTY
+        assert board.is_obstacle(0, 0) and board.is_obstacle(8, 8)
+        assert reader.position(1).winner == "X"
+
+
+def test_append_resumes_and_rewrites_index(tmp_path):
+    path = str(tmp_path / "games.ttr")
+    write_games(path, GAMES[:2])
+    with GameWriter(path, append=True) as writer:
+        assert len(writer) == 2
+        assert writer.add_game(*GAMES[2]) == 2
+    with GameReader(path) as reader:
+        assert len(reader) == 3
+        for n in range(3):
+            assert_game(reader[n], GAMES[n])
+
+
+def test_unclosed_file_is_rescanned_and_torn_tail_dropped(tmp_path):
+    path = str(tmp_path / "games.ttr")
+    crashed = str(tmp_path / "crashed.ttr")
+    writer = GameWriter(path)
+    for game in GAMES:
+        writer.add_game(*game)
+    writer.flush()
+    shutil.copy(path, crashed)          # the writer "died" here: no index
+    writer.close()
+
+    with GameReader(crashed) as reader:
+        assert len(reader) == len(GAMES)
+
+    # cut the last block in half
+    size = os.path.getsize(crashed)
+    with open(crashed, "r+b") as f:
+        f.truncate(size - len(encode_game(*GAMES[-1])) // 2)
+    with GameReader(crashed) as reader:
+        assert len(reader) == len(GAMES) - 1
+        for n in range(len(GAMES) - 1):
+            assert_game(reader[n], GAMES[n])
+
+    # appending drops the torn bytes and closes the file properly
+    with GameWriter(crashed, append=True) as writer:
+        writer.add_game(*GAMES[-1])
+    with GameReader(crashed) as reader:
+        assert len(reader) == len(GAMES)
+        assert_game(reader[len(GAMES) - 1], GAMES[-1])
+
+
+def test_reader_rejects_other_files(tmp_path):
+    path = tmp_path / "junk.ttr"
+    path.write_bytes(b"TTTB\x01")
+    with pytest.raises(ValueError):
+        GameReader(str(path))
@@ -0,0 +1,119 @@
+"""Board and BitBoard: make/unmake, winner, live lines and Zobrist keys."""
+import random
+
+import pytest
+
+from bitboard import BitBoard
+from board import Board, win_lines
+
+
+def brute_live_lines(board) -> int:
+    """Obstacle-free lines not holding stones of both sides, counted from scratch."""
+    cols, count = board.cols, 0
+    for line in win_lines(board.rows, board.cols, board.win_len):
+        cells = {board.get(c // cols, c % cols) for c in line}
+        if Board.OBSTACLE not in cells and not {"X", "O"} <= cells:
+            count += 1
+    return count
+
+
+def brute_winner(board):
+    cols = board.cols
+    for line in win_lines(board.rows, board.cols, board.win_len):
+        cells = {board.get(c // cols, c % cols) for c in line}
+        if len(cells) == 1 and cells <= {"X", "O"}:
+            return cells.pop()
+    return None
+
+
+def assert_same(board: Board, bb: BitBoard) -> None:
+    assert bb.grid() == board.grid()
+    assert bb.winner == board.winner == brute_winner(board)
+    assert bb.live_lines == board.live_lines == brute_live_lines(board)
+    assert bb.hash_key == board.hash_key
+    assert bb.hash_key == Board.from_grid(board.grid(), board.win_len).hash_key
+    assert sorted(bb.legal_moves()) == sorted(board.legal_moves())
+    assert bb.move_count == board.move_count
+
+
+@pytest.mark.parametrize("seed", range(8))
+def test_random_games_agree_and_unwind(seed):
+    rng = random.Random(seed)
+    board = Board(6, 7, 4, num_obstacles=6, seed=seed)
+    bb = BitBoard.from_board(board)
+    start_grid, start_hash = board.grid(), board.hash_key
+    assert_same(board, bb)
+
+    turn = "X"
+    while board.winner is None and board.legal_moves():
+        i, j = rng.choice(sorted(board.legal_moves()))
+        board.make_move(i, j, turn)
+        bb.make_move(i, j, turn)
+        assert board.last_move == bb.last_move == (i, j)
+        assert_same(board, bb)
+        turn = "O" if turn == "X" else "X"
+
+    while board.move_count:
+        assert board.unmake_move() == bb.unmake_move()
+        assert_same(board, bb)
+    assert board.grid() == start_grid
+    assert board.hash_key == start_hash
+
+
+def test_winner_on_last_cell_of_line():
+    board = Board(5, 5, 4, num_obstacles=0)
+    for k, (i, j) in enumerate([(0, 0), (4, 0), (1, 1), (4, 1), (2, 2), (4, 2)]):
+        board.make_move(i, j, "XO"[k % 2])
+    assert board.winner is None
+    board.make_move(3, 3, "X")
+    assert board.winner == "X" and board.has_winner("X")
+    board.unmake_move()
+    assert board.winner is None
+
+
+def test_from_grid_and_bitboard_round_trip():
+    grid = [
+        ["X", "O", ".", "#"],
+        [".", "X", "O", "."],
+        ["#", ".", "X", "."],
+        [".", "O", ".", "."],
+    ]
+    board = Board.from_grid(grid, win_len=3)
+    assert board.winner == "X"
+    bb = BitBoard.from_board(board)
+    assert bb.to_board().grid() == grid
+    assert bb.winner == "X"
+    assert bb.hash_key == board.hash_key
+    assert bb.live_lines == board.live_lines == brute_live_lines(board)
+
+
+def test_copy_is_independent():
+    board = Board(5, 5, 4, num_obstacles=3, seed=1)
+    i, j = sorted(board.legal_moves())[0]
+    board.make_move(i, j, "X")
+    clone = board.copy()
+    k, l = sorted(clone.legal_moves())[0]
+    clone.make_move(k, l, "O")
+    assert board.move_count == 1 and clone.move_count == 2
+    assert board.get(k, l) == Board.EMPTY
+    clone.unmake_move()
+    assert clone.hash_key == board.hash_key
+
+
+def test_reset_with_seed_repeats_layout():
+    board = Board(7, 7, 4, num_obstacles=8, seed=5)
+    twin = Board(7, 7, 4, num_obstacles=8, seed=5)
+    assert board.grid() == twin.grid()
+    board.make_move(*sorted(board.legal_moves())[0], "X")
+    board.reset()
+    twin.reset()
+    assert board.move_count == 0
+    assert board.grid() == twin.grid()
+    assert board.hash_key == Board.from_grid(board.grid()).hash_key
+
+
+def test_min_open_lines_is_honoured_or_rejected():
+    board = Board(6, 6, 4, num_obstacles=6, seed=3, min_open_lines=30)
+    assert board.live_lines >= 30
+    with pytest.raises(ValueError):
+        Board(4, 4, 4, num_obstacles=1, min_open_lines=11)
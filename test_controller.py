@@ -0,0 +1,121 @@
+"""Headless GameController games driven by ImmediateScheduler."""
+import random
+
+import controller
+from board import Board
+from controller import GameController, GameState
+from game_record import GameReader, GameRecorder, GameWriter
+from scheduler import ImmediateScheduler
+
+
+class Log:
+    """GameObserver that keeps everything it is told."""
+
+    def __init__(self) -> None:
+        self.moves = []
+        self.states = []
+        self.stats = []
+
+    def on_board_change(self, coords, symbol) -> None:
+        self.moves.append((coords, symbol))
+
+    def on_state_change(self, state, next_turn) -> None:
+        self.states.append((state, next_turn))
+
+    def on_search_stats(self, stats) -> None:
+        self.stats.append(stats)
+
+
+def new_game(mode="bot", difficulty="easy", board=None):
+    scheduler = ImmediateScheduler()
+    board = board or Board(5, 5, 4, num_obstacles=0)
+    game = GameController(board, mode, difficulty, scheduler=scheduler)
+    log = Log()
+    game.register(log)
+    return game, scheduler, log
+
+
+def play_out(game, scheduler, log, rng):
+    """Human plays random legal moves until the game ends."""
+    board = game.getBoard()
+    while log.states[-1][0] is GameState.IN_PROGRESS:
+        game.play(*rng.choice(sorted(board.legal_moves())))
+        scheduler.run_until_idle()
+
+
+def test_bot_game_runs_to_the_end():
+    rng = random.Random(1)
+    game, scheduler, log = new_game(board=Board(5, 5, 4, num_obstacles=3, seed=0))
+    play_out(game, scheduler, log, rng)
+
+    assert log.states[-1][0] is not GameState.IN_PROGRESS
+    assert log.states[-1][1] is None
+    symbols = [symbol for _, symbol in log.moves]
+    assert symbols == ["X", "O"] * (len(symbols) // 2) + ["X"] * (len(symbols) % 2)
+    assert len(log.stats) == symbols.count("O")
+    board = game.getBoard()
+    assert board.move_count == len(log.moves)
+    if board.winner:
+        assert log.states[-1][0] is (GameState.X_WON if board.winner == "X" else GameState.O_WON)
+
+
+def test_bot_waits_for_the_scheduler():
+    game, scheduler, log = new_game()
+    game.play(2, 2)
+    assert [s for _, s in log.moves] == ["X"]
+    game.play(0, 1)                     # not the human's turn: ignored
+    assert game.getBoard().move_count == 1
+    assert scheduler.run_until_idle() >= 2     # delayed start + search
+    assert [s for _, s in log.moves] == ["X", "O"]
+    assert log.states[-1] == (GameState.IN_PROGRESS, "X")
+
+
+def test_reset_drops_pending_and_running_searches():
+    game, scheduler, log = new_game()
+    game.play(2, 2)
+    game.reset()                        # before the delayed start fires
+    scheduler.run_until_idle()
+    assert game.getBoard().move_count == 0
+
+    game.play(2, 2)
+    scheduler._queue.popleft().callback()   # the search is now queued
+    game.reset()
+    scheduler.run_until_idle()
+    assert game.getBoard().move_count == 0
+    assert log.states[-1] == (GameState.IN_PROGRESS, "X")
+
+
+class Broken:
+    last_stats = None
+
+    def get_best_move(self, board, ai, human, cancel=None):
+        raise RuntimeError("search blew up")
+
+
+def test_failed_search_falls_back_to_a_legal_move(monkeypatch, caplog):
+    monkeypatch.setattr(controller, "create_ai", lambda difficulty: Broken())
+    game, scheduler, log = new_game()
+    game.play(2, 2)
+    scheduler.run_until_idle()
+    assert [s for _, s in log.moves] == ["X", "O"]
+    assert "AI search failed" in caplog.text
+
+
+def test_friend_game_and_recorder(tmp_path):
+    board = Board(3, 3, 3, num_obstacles=0)
+    game, scheduler, log = new_game("friend", board=board)
+    path = str(tmp_path / "games.ttr")
+    writer = GameWriter(path)
+    GameRecorder(writer, game)
+    for i, j in [(0, 0), (1, 0), (1, 1), (2, 0), (2, 2)]:
+        game.play(i, j)
+    assert scheduler.run_until_idle() == 0
+    assert log.states[-1] == (GameState.X_WON, None)
+    game.reset()
+    game.play(1, 1)
+    game.reset()                        # abandoned: recorded as unfinished
+    writer.close()
+
+    with GameReader(path) as reader:
+        assert [g.winner for g in reader] == ["X", "unfinished"]
+        assert reader[0].moves == [(0, 0), (1, 0), (1, 1), (2, 0), (2, 2)]
@@ -1,10 +1,115 @@
+# themes.py
+"""Theme assets: one texture set per element, loaded once and shared.
+
+Each element lives in ``assets/<folder>/`` with ``bg.png``, ``cell.png``,
+``X.png``, ``O.png`` and ``obstacle.png``.  If the folder also holds
+``<folder>.atlas`` (build it with ``python themes.py``) the board pieces
+come out of that one atlas image; otherwise the PNGs are loaded one by
+one.  Either way each folder is read from disk once per process, and
+elements without their own folder fall back to wood.
+"""
+import os
+import sys
+import tempfile
+from functools import lru_cache
 from pathlib import Path
+from typing import Dict, List, Optional
+
+ASSETS = Path(__file__).resolve().parent / "assets"
+FALLBACK = "wood"
+
+# ngũ hành: element -> (display name, asset folder)
+ELEMENTS = {
+    "kim":  ("Kim", "metal"),
+    "moc":  ("Mộc", "wood"),
+    "thuy": ("Thủy", "water"),
+    "hoa":  ("Hỏa", "fire"),
+    "tho":  ("Thổ", "earth"),
+}
+
+# texture key -> file stem; board marks use the same keys as Board cells
+PIECES = {"": "cell", "X": "X", "O": "O", "#": "obstacle"}
+BACKGROUND = "bg"        # full-screen image, never packed into the atlas
+
+
+def _folder(name: str) -> str:
+    folder = ELEMENTS[name][1] if name in ELEMENTS else name
+    return folder if (ASSETS / folder).is_dir() else FALLBACK
+
+
+@lru_cache(maxsize=None)
+def _textures(folder: str) -> Dict[str, object]:
+    """Texture per PIECES key plus BACKGROUND, read from disk once."""
+    # kivy imported here so the AI/headless tools can import themes
+    from kivy.core.image import Image as CoreImage
+    base = ASSETS / folder
+    textures = {BACKGROUND: CoreImage(str(base / "bg.png")).texture}
+    atlas_path = base / f"{folder}.atlas"
+    if atlas_path.exists():
+        from kivy.atlas import Atlas
+        atlas = Atlas(str(atlas_path))
+        textures.update((key, atlas[stem]) for key, stem in PIECES.items())
+    else:
+        textures.update((key, CoreImage(str(base / f"{stem}.png")).texture)
+                        for key, stem in PIECES.items())
+    return textures
+
 
 class Theme:
     def __init__(self, name: str):
-        base = Path("assets") / name
+        self.name = name
+        self.folder = _folder(name)
+        base = ASSETS / self.folder
         self.bg       = str(base / "bg.png")
-        self.cell_bg  = str(base / "cell.png")   # nếu đã thêm
-        self.x_icon   = str(base / "x.png")
-        self.o_icon   = str(base / "o.png")
-        self.obs_icon = str(base / "obstacle.png")
\ No newline at end of file
+        self.cell_bg  = str(base / "cell.png")
+        self.x_icon   = str(base / "X.png")
+        self.o_icon   = str(base / "O.png")
+        self.obs_icon = str(base / "obstacle.png")
+
+    @property
+    def display_name(self) -> str:
+        return ELEMENTS[self.name][0] if self.name in ELEMENTS else self.name
+
+    @property
+    def background(self):
+        return _textures(self.folder)[BACKGROUND]
+
+    def texture(self, mark: str):
+        """Cached Texture for a board mark ('', 'X', 'O' or '#')."""
+        return _textures(self.folder)[mark]
+
+
+@lru_cache(maxsize=None)
+def load_theme(name: str) -> Theme:
+    """The shared Theme for an element (or asset folder) name."""
+    return Theme(name)
+
+
+def build_atlas(folder: str, tile: int = 256) -> List[str]:
+    """Pack one folder's pieces, scaled to *tile* px, into ``<folder>.atlas``.
+
+    Needs Pillow; the source PNGs are 1024 px, far more than a cell needs.
+    """
+    from kivy.atlas import Atlas
+    from PIL import Image as PILImage
+    base = ASSETS / folder
+    with tempfile.TemporaryDirectory() as tmp:
+        files = []
+        for stem in PIECES.values():
+            path = os.path.join(tmp, f"{stem}.png")
+            with PILImage.open(base / f"{stem}.png") as img:
+                img.convert("RGBA").resize((tile, tile), PILImage.LANCZOS).save(path)
+            files.append(path)
+        _, meta = Atlas.create(str(base / folder), files, tile * 2 + 16)  # 2×2 + padding
+    return [uid for page in meta.values() for uid in page]
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    folders = argv if argv else sorted(p.name for p in ASSETS.iterdir() if p.is_dir())
+    for folder in folders:
+        print(f"{folder}: {', '.join(build_atlas(folder))}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
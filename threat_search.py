@@ -0,0 +1,268 @@
+# threat_search.py
+"""Threat-space search: forced wins by continuous fours (VCF) and threes (VCT).
+
+Only forcing moves are explored, so a win twenty plies deep costs a few
+thousand nodes instead of a full-width tree.  A *four* is an open line
+(no obstacle, no enemy stone) one stone short of ``win_len``; its empty
+cell must be answered at once.  A *three* is a move after which the
+attacker has a move making two fours at once; the defender may answer it
+only on the cells that break every such double four, or with a four of
+their own.  Answers are enumerated completely, so a proof holds against
+any defence; positions the search cannot prove are simply reported as
+unknown.
+"""
+import math
+import time
+from typing import Dict, List, Optional, Tuple
+
+from board import Board
+from bitboard import BitBoard, Engine
+
+Move = Tuple[int, int]
+# Settings below this win length have no meaningful threes.
+MIN_WIN_LEN = 4
+
+
+class _Timeout(Exception):
+    """Raised when the threat search runs out of time."""
+
+
+class ThreatSearch:
+    """Finds forced wins for either side within a small time budget."""
+
+    def __init__(self, time_limit: float = 0.2, max_depth: int = 12,
+                 use_threes: bool = True) -> None:
+        self.time_limit = time_limit
+        self.max_depth = max_depth      # attacker moves per sequence
+        self.use_threes = use_threes
+        self.nodes = 0
+        self._deadline = math.inf
+        self._proof = 0                 # cells used by the last proof
+
+    # -------- public API --------------------------------------------------
+
+    def solve(self, board: Engine, me: str, opp: str
+              ) -> Tuple[Optional[str], List[Move]]:
+        """What the threat search says about *me* to move.
+
+        Returns ``("win", [move])`` for a forced win, ``("defend", moves)``
+        with every move that stops the opponent's forced win, or
+        ``(None, [])`` when there is nothing forced (or no time to tell).
+        """
+        self.nodes = 0
+        self._deadline = time.perf_counter() + self.time_limit
+        bb = BitBoard.from_board(board) if isinstance(board, Board) else board
+        base = bb.move_count
+        try:
+            move = self._find_win(bb, me, opp)
+            if move is not None:
+                return "win", [move]
+            if self._find_win(bb, opp, me) is None:
+                return None, []
+            return "defend", self._defences(bb, me, opp)
+        except _Timeout:
+            while bb.move_count > base:
+                bb.unmake_move()
+            return None, []
+
+    def find_win(self, board: Engine, attacker: str, defender: str) -> Optional[Move]:
+        """First move of a forced win for *attacker* to move, if one is found."""
+        self.nodes = 0
+        self._deadline = time.perf_counter() + self.time_limit
+        bb = BitBoard.from_board(board) if isinstance(board, Board) else board
+        base = bb.move_count
+        try:
+            return self._find_win(bb, attacker, defender)
+        except _Timeout:
+            while bb.move_count > base:
+                bb.unmake_move()
+            return None
+
+    # -------- search ------------------------------------------------------
+
+    def _find_win(self, bb: BitBoard, attacker: str, defender: str) -> Optional[Move]:
+        """VCF first (cheap), then VCT, each deepened one attacker move at a time."""
+        self._proof = 0
+        modes = (False, True) if self.use_threes and bb.win_len >= MIN_WIN_LEN else (False,)
+        for threes in modes:
+            for depth in range(1, self.max_depth + 1):
+                move = self._attack_root(bb, attacker, defender, depth, threes)
+                if move is not None:
+                    return move
+        return None
+
+    def _attack_root(self, bb: BitBoard, attacker: str, defender: str,
+                     depth: int, threes: bool) -> Optional[Move]:
+        self._memo: Dict[int, int] = {}
+        # a three needs two more attacker moves (the double four, the win)
+        for bit in self._attacker_moves(bb, attacker, defender, threes and depth > 1):
+            if bit < 0:
+                return _move(bb, -bit)          # immediate win
+            bb.make_move(*_move(bb, bit), attacker)
+            won = self._defend(bb, attacker, defender, depth, threes)
+            bb.unmake_move()
+            if won:
+                self._proof |= bit
+                return _move(bb, bit)
+        return None
+
+    def _attack(self, bb: BitBoard, attacker: str, defender: str,
+                depth: int, threes: bool) -> bool:
+        """Attacker to move: can it force a win within *depth* moves?"""
+        self._tick()
+        key = bb.hash_key
+        if self._memo.get(key, -1) >= depth:
+            return False                        # already failed this deep
+        for bit in self._attacker_moves(bb, attacker, defender, threes and depth > 1):
+            if bit < 0:
+                return True
+            if depth <= 0:
+                break
+            bb.make_move(*_move(bb, bit), attacker)
+            won = self._defend(bb, attacker, defender, depth, threes)
+            bb.unmake_move()
+            if won:
+                self._proof |= bit
+                return True
+        self._memo[key] = depth
+        return False
+
+    def _attacker_moves(self, bb: BitBoard, attacker: str, defender: str, threes: bool):
+        """Forcing moves as single-bit masks; a negative mask wins on the spot."""
+        k = bb.win_len
+        wins, fours, _ = _scan(bb, attacker, defender, k)
+        if wins:
+            yield -(wins & -wins)
+            return
+        their_wins, _, _ = _scan(bb, defender, attacker, k)
+        if their_wins:
+            if their_wins & (their_wins - 1):
+                return                          # two enemy fours: lost
+            # forced to block; only useful if the block is itself a threat
+            if their_wins in fours or threes:
+                yield their_wins
+            return
+        yield from fours
+        if threes:
+            for bit in _three_moves(bb, attacker, defender, k, fours):
+                yield bit
+
+    def _defend(self, bb: BitBoard, attacker: str, defender: str,
+                depth: int, threes: bool) -> bool:
+        """Defender to move after a threat: does every answer still lose?"""
+        self._tick()
+        k = bb.win_len
+        their_wins, their_fours, _ = _scan(bb, defender, attacker, k)
+        if their_wins:
+            return False                        # defender simply wins
+        wins, fours, partner = _scan(bb, attacker, defender, k)
+        if wins & (wins - 1):
+            self._proof |= wins
+            return True                         # two fours: cannot block both
+        if wins:
+            replies = wins
+        else:
+            # a three: answer on a cell shared by every double four
+            doubles = [
+                (bit, cells & ~bit) for bit, cells in partner.items()
+                if _popcount(cells & ~bit) >= 2
+            ]
+            if not doubles:
+                return False                    # the move was not forcing
+            replies = ~0
+            for bit, cells in doubles:
+                replies &= bit | cells
+            replies &= bb.legal_mask
+            for bit in their_fours:
+                replies |= bit                  # or counter with a four
+            if not replies:
+                return True
+        for bit in _bits(replies):
+            bb.make_move(*_move(bb, bit), defender)
+            won = self._attack(bb, attacker, defender, depth - 1, threes)
+            bb.unmake_move()
+            if not won:
+                return False
+        self._proof |= replies
+        return True
+
+    def _defences(self, bb: BitBoard, me: str, opp: str) -> List[Move]:
+        """Moves after which *opp* no longer has a forced win."""
+        proof = self._proof
+        _, my_fours, _ = _scan(bb, me, opp, bb.win_len)
+        candidates = _bits(proof & bb.legal_mask)
+        candidates += [bit for bit in my_fours if not bit & proof]
+        out = []
+        for bit in candidates:
+            move = _move(bb, bit)
+            bb.make_move(*move, me)
+            refuted = self._find_win(bb, opp, me) is None
+            bb.unmake_move()
+            if refuted:
+                out.append(move)
+        return out
+
+    def _tick(self) -> None:
+        self.nodes += 1
+        if not self.nodes & 63 and time.perf_counter() >= self._deadline:
+            raise _Timeout
+
+
+# -------- line scanning ---------------------------------------------------
+
+def _scan(bb: BitBoard, me: str, opp: str, k: int
+          ) -> Tuple[int, List[int], Dict[int, int]]:
+    """*me*'s winning cells (mask), four-making moves and their new wins.
+
+    ``partner[bit]`` is the mask of cells *me* would threaten to win on
+    after playing *bit* (existing winning cells included).
+    """
+    mine, theirs = bb.bits(me), bb.bits(opp)
+    wins = 0
+    partner: Dict[int, int] = {}
+    for line in bb.open_lines:
+        if line & theirs:
+            continue
+        n = _popcount(line & mine)
+        if n == k - 1:
+            wins |= line & ~mine
+        elif n == k - 2:
+            empty = line & ~mine
+            a = empty & -empty
+            b = empty ^ a
+            partner[a] = partner.get(a, 0) | b
+            partner[b] = partner.get(b, 0) | a
+    if wins:
+        for bit in partner:
+            partner[bit] |= wins
+    return wins, list(partner), partner
+
+
+def _three_moves(bb: BitBoard, me: str, opp: str, k: int, fours: List[int]) -> List[int]:
+    """Empty cells on open lines holding k-3 of *me*'s stones (fours excluded)."""
+    mine, theirs = bb.bits(me), bb.bits(opp)
+    seen = 0
+    for bit in fours:
+        seen |= bit
+    cells = 0
+    for line in bb.open_lines:
+        if not line & theirs and _popcount(line & mine) == k - 3 and line & mine:
+            cells |= line & ~mine
+    return _bits(cells & ~seen)
+
+
+def _popcount(mask: int) -> int:
+    return bin(mask).count("1")
+
+
+def _bits(mask: int) -> List[int]:
+    out = []
+    while mask:
+        low = mask & -mask
+        out.append(low)
+        mask ^= low
+    return out
+
+
+def _move(bb: BitBoard, bit: int) -> Move:
+    return divmod(bit.bit_length() - 1, bb.cols)
@@ -0,0 +1,257 @@
+# tournament.py
+"""Headless self-play tournament between MinimaxAI configurations.
+
+Example::
+
+    python tournament.py --engine name=new,difficulty=hard,time=0.3 \\
+                         --engine name=old,difficulty=hard,time=0.3,radius=1 \\
+                         --rows 7 --cols 7 --win-len 4 --obstacles 5 \\
+                         --games 400 --out results.jsonl --record games.ttr
+
+Every obstacle layout (one seed) is played twice with colours swapped.
+Results are appended to ``--out`` as JSON lines while the games finish,
+and with exactly two engines an SPRT decides when to stop early.
+``--record`` also appends every game to a binary record file (see
+game_record.py) for replay and analysis.
+Nothing here imports Kivy.
+"""
+import argparse
+import itertools
+import json
+import math
+import random
+import sys
+import time
+from contextlib import nullcontext
+from multiprocessing import Pool, cpu_count
+from typing import Dict, Iterator, List, Optional, Tuple, Union
+
+from board import Board
+from game_record import DRAW, O_WON, X_WON, GameWriter, obstacle_cells
+from mcts import MCTSAI
+from minimax import BUDGETS, MinimaxAI, SearchBudget
+from parallel_search import ParallelMinimaxAI
+
+EngineConfig = Dict[str, object]
+
+
+# -------- configuration ---------------------------------------------------
+
+def parse_engine(spec: str) -> EngineConfig:
+    """``name=a,difficulty=hard,time=0.5,nodes=1000,depth=6,radius=2,threats=1,workers=4``.
+
+    ``workers`` > 1 searches with ParallelMinimaxAI on that many processes.
+    ``engine=mcts`` builds an MCTSAI instead: ``time`` and ``nodes``
+    (playouts), ``radius`` and ``threats`` apply, ``difficulty`` does not.
+    """
+    cfg: EngineConfig = {}
+    for part in spec.split(","):
+        key, _, value = part.partition("=")
+        cfg[key.strip()] = value.strip()
+    cfg.setdefault("difficulty", "hard")
+    cfg.setdefault("name", spec)
+    return cfg
+
+
+def build_ai(cfg: EngineConfig) -> Union[MinimaxAI, MCTSAI]:
+    threats = cfg.get("threats")
+    if cfg.get("engine") == "mcts":
+        kw = {} if threats is None else {"use_threats": bool(int(threats))}
+        return MCTSAI(time_limit=float(cfg.get("time", 2.0)),
+                      playouts=int(cfg["nodes"]) if "nodes" in cfg else None,
+                      radius=int(cfg.get("radius", 1)), **kw)
+    base = BUDGETS.get(str(cfg["difficulty"]), BUDGETS["hard"])
+    budget = SearchBudget(
+        time_limit=float(cfg["time"]) if "time" in cfg else base.time_limit,
+        node_limit=int(cfg["nodes"]) if "nodes" in cfg else base.node_limit,
+        max_depth=int(cfg["depth"]) if "depth" in cfg else base.max_depth,
+    )
+    kw = dict(budget=budget, radius=int(cfg.get("radius", 2)),
+              use_threats=None if threats is None else bool(int(threats)))
+    workers = int(cfg.get("workers", 1))
+    if workers > 1:
+        return ParallelMinimaxAI(str(cfg["difficulty"]), workers=workers, **kw)
+    return MinimaxAI(str(cfg["difficulty"]), **kw)
+
+
+# -------- one game (runs in a worker process) -----------------------------
+
+def play_game(job: Tuple) -> Dict[str, object]:
+    game_id, seed, x_cfg, o_cfg, rows, cols, win_len, obstacles = job
+    random.seed(seed)  # easy mode's random moves become reproducible too
+    board = Board(rows, cols, win_len, obstacles, seed=seed, min_open_lines=1)
+    players = {"X": build_ai(x_cfg), "O": build_ai(o_cfg)}
+    think = {"X": 0.0, "O": 0.0}
+    turn, moves = "X", []
+    while board.winner is None and not board.is_full():
+        other = "O" if turn == "X" else "X"
+        start = time.perf_counter()
+        move = players[turn].get_best_move(board, turn, other)
+        think[turn] += time.perf_counter() - start
+        board.make_move(move[0], move[1], turn)
+        moves.append(move)
+        turn = other
+    return {
+        "game": game_id,
+        "seed": seed,
+        "x": x_cfg["name"],
+        "o": o_cfg["name"],
+        "winner": board.winner or "draw",
+        "plies": len(moves),
+        "moves": moves,
+        "obstacles": obstacle_cells(board),
+        "time_x": round(think["X"], 4),
+        "time_o": round(think["O"], 4),
+    }
+
+
+def schedule(engines: List[EngineConfig], games: int, seed: int,
+             rows: int, cols: int, win_len: int, obstacles: int) -> Iterator[Tuple]:
+    """Round robin; each seeded layout is played once with each colour."""
+    rng = random.Random(seed)
+    game_id = 0
+    for _ in range(0, games, 2):
+        layout_seed = rng.getrandbits(32)
+        for a, b in itertools.combinations(engines, 2):
+            for x_cfg, o_cfg in ((a, b), (b, a)):
+                yield (game_id, layout_seed, x_cfg, o_cfg, rows, cols, win_len, obstacles)
+                game_id += 1
+
+
+# -------- statistics ------------------------------------------------------
+
+class PairStats:
+    """Win/draw/loss tally of engine *a* against engine *b*."""
+
+    def __init__(self) -> None:
+        self.wins = self.draws = self.losses = 0
+
+    @property
+    def games(self) -> int:
+        return self.wins + self.draws + self.losses
+
+    def score(self) -> float:
+        return (self.wins + 0.5 * self.draws) / self.games if self.games else 0.5
+
+    def elo(self) -> Tuple[float, float]:
+        """Elo difference and its 95% error margin."""
+        n = self.games
+        if not n:
+            return 0.0, math.inf
+        s = min(max(self.score(), 1e-6), 1 - 1e-6)
+        var = (self.wins * (1 - s) ** 2 + self.draws * (0.5 - s) ** 2
+               + self.losses * s ** 2) / n
+        margin = 1.96 * math.sqrt(var / n)
+        lo = min(max(s - margin, 1e-6), 1 - 1e-6)
+        hi = min(max(s + margin, 1e-6), 1 - 1e-6)
+        return _elo(s), (_elo(hi) - _elo(lo)) / 2
+
+    def llr(self, elo0: float, elo1: float) -> float:
+        """Log-likelihood ratio of H1 (elo1) vs H0 (elo0), normal approximation."""
+        n = self.games
+        if n < 2:
+            return 0.0
+        s = self.score()
+        var = (self.wins * (1 - s) ** 2 + self.draws * (0.5 - s) ** 2
+               + self.losses * s ** 2) / n
+        if var <= 0:
+            return 0.0
+        s0, s1 = _expected(elo0), _expected(elo1)
+        return n * (s1 - s0) * (2 * s - s0 - s1) / (2 * var)
+
+
+def _elo(score: float) -> float:
+    return -400 * math.log10(1 / score - 1)
+
+
+def _expected(elo: float) -> float:
+    return 1 / (1 + 10 ** (-elo / 400))
+
+
+def sprt_bounds(alpha: float, beta: float) -> Tuple[float, float]:
+    return math.log(beta / (1 - alpha)), math.log((1 - beta) / alpha)
+
+
+# -------- driver ----------------------------------------------------------
+
+def run(argv: Optional[List[str]] = None) -> int:
+    p = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    p.add_argument("--engine", action="append", required=True,
+                   help="engine spec, e.g. name=a,difficulty=hard,time=0.5")
+    p.add_argument("--rows", type=int, default=5)
+    p.add_argument("--cols", type=int, default=5)
+    p.add_argument("--win-len", type=int, default=4)
+    p.add_argument("--obstacles", type=int, default=5)
+    p.add_argument("--games", type=int, default=100, help="games per pairing")
+    p.add_argument("--seed", type=int, default=1)
+    p.add_argument("--workers", type=int, default=cpu_count())
+    p.add_argument("--out", default="tournament.jsonl")
+    p.add_argument("--record", help="also append the games to this record file")
+    p.add_argument("--elo0", type=float, default=0.0)
+    p.add_argument("--elo1", type=float, default=10.0)
+    p.add_argument("--alpha", type=float, default=0.05)
+    p.add_argument("--beta", type=float, default=0.05)
+    args = p.parse_args(argv)
+
+    engines = [parse_engine(spec) for spec in args.engine]
+    if len(engines) < 2:
+        p.error("need at least two --engine specs")
+    names = [str(e["name"]) for e in engines]
+    if len(set(names)) != len(names):
+        p.error("engine names must be unique")
+
+    stats: Dict[Tuple[str, str], PairStats] = {
+        (a, b): PairStats() for a, b in itertools.combinations(names, 2)
+    }
+    lower, upper = sprt_bounds(args.alpha, args.beta)
+    use_sprt = len(engines) == 2
+    verdict = None
+
+    jobs = schedule(engines, args.games, args.seed, args.rows, args.cols,
+                    args.win_len, args.obstacles)
+    record = GameWriter(args.record, append=True) if args.record else None
+    results = {"X": X_WON, "O": O_WON, "draw": DRAW}
+    # pool processes are daemonic and cannot start search workers, so
+    # parallel engines play one game at a time here, using the cores per move
+    parallel = any(int(e.get("workers", 1)) > 1 for e in engines)
+    with open(args.out, "a", encoding="utf-8") as out, \
+            (nullcontext() if parallel else Pool(args.workers)) as pool:
+        games = map(play_game, jobs) if pool is None else pool.imap_unordered(play_game, jobs)
+        for result in games:
+            out.write(json.dumps(result) + "\n")
+            out.flush()
+            if record is not None:
+                record.add_game(args.rows, args.cols, args.win_len, result["obstacles"],
+                                result["moves"], results[result["winner"]])
+
+            x, o, winner = result["x"], result["o"], result["winner"]
+            key = (x, o) if (x, o) in stats else (o, x)
+            first = key[0]
+            pair = stats[key]
+            if winner == "draw":
+                pair.draws += 1
+            elif (winner == "X") == (x == first):
+                pair.wins += 1
+            else:
+                pair.losses += 1
+
+            if use_sprt:
+                llr = pair.llr(args.elo0, args.elo1)
+                if llr >= upper or llr <= lower:
+                    verdict = "H1 accepted" if llr >= upper else "H0 accepted"
+                    break
+    if record is not None:
+        record.close()
+
+    for (a, b), pair in stats.items():
+        elo, margin = pair.elo()
+        print(f"{a} vs {b}: +{pair.wins} ={pair.draws} -{pair.losses} "
+              f"score {pair.score():.3f}  Elo {elo:+.1f} ± {margin:.1f}")
+        if use_sprt:
+            print(f"  SPRT [{args.elo0}, {args.elo1}] LLR {pair.llr(args.elo0, args.elo1):.2f} "
+                  f"({lower:.2f}, {upper:.2f}): {verdict or 'inconclusive'}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(run())
@@ -0,0 +1,60 @@
+# transposition.py
+from typing import List, NamedTuple, Optional, Tuple
+
+EXACT, LOWER, UPPER = 0, 1, 2
+
+
+class TTEntry(NamedTuple):
+    key: int
+    depth: int                       # remaining search depth below the node
+    value: float
+    flag: int                        # EXACT / LOWER / UPPER bound
+    move: Optional[Tuple[int, int]]  # best (or refuting) move found
+    age: int
+
+
+class TranspositionTable:
+    """Fixed-size hash table of searched positions keyed by Zobrist hash.
+
+    Each key maps to exactly one slot.  On a collision the new entry wins
+    if the slot holds the same position, was written by an older search,
+    or was searched less deeply ("depth-preferred, age-aware").
+    """
+
+    def __init__(self, size: int = 1 << 16) -> None:
+        # round up to a power of two so the slot is a cheap AND
+        self._size = 1 << max(0, size - 1).bit_length()
+        self._mask = self._size - 1
+        self._slots: List[Optional[TTEntry]] = [None] * self._size
+        self._age = 0
+
+    @property
+    def size(self) -> int: return self._size
+
+    def new_search(self) -> None:
+        """Mark current entries as stale so fresh results replace them first."""
+        self._age += 1
+
+    def clear(self) -> None:
+        self._slots = [None] * self._size
+        self._age = 0
+
+    def probe(self, key: int) -> Optional[TTEntry]:
+        entry = self._slots[key & self._mask]
+        if entry is not None and entry.key == key:
+            return entry
+        return None
+
+    def store(self, key: int, depth: int, value: float, flag: int,
+              move: Optional[Tuple[int, int]]) -> None:
+        slot = key & self._mask
+        old = self._slots[slot]
+        if (
+            old is None
+            or old.key == key
+            or old.age != self._age
+            or depth >= old.depth
+        ):
+            if move is None and old is not None and old.key == key:
+                move = old.move  # keep the known best move for ordering
+            self._slots[slot] = TTEntry(key, depth, value, flag, move, self._age)
@@ -1,74 +1,138 @@
 # widgets_board.py
-from kivy.uix.gridlayout import GridLayout
-from kivy.uix.image import Image
-from kivy.uix.behaviors import ButtonBehavior
+from typing import Callable, List, Optional, Tuple
+
 from kivy.core.window import Window
-from kivy.properties import StringProperty
+from kivy.graphics import Rectangle
+from kivy.uix.widget import Widget
 
-CELL_SIZE = 80      # px – cố định
-CELLS_PER_SIDE = 5  # 5×5
+from themes import Theme, load_theme
 
-class XOCell(ButtonBehavior, Image):
-    mark = StringProperty('')
+MIN_CELL = 20       # px – smallest cell we let the window shrink to
+MIN_SIDE = 400      # px – window never gets narrower than this
 
-    def __init__(self, row, col, on_press_cb, **kw):
-        super().__init__(**kw)
-        self.row, self.col = row, col
-        self.source = 'assets/wood/cell.png'   # ô trống
-        self.allow_stretch = True
-        self.keep_ratio    = False
-        self.size_hint = (None, None)
-        self.size       = (CELL_SIZE, CELL_SIZE)
-        self._cb = on_press_cb           # gọi về controller
-
-    # ―――― sự kiện người chơi ―――――――――――――――――――――――――――――――――
-    def on_release(self):
-        self._cb(self.row, self.col)
-
-    # ―――― cập nhật quân cờ ―――――――――――――――――――――――――――――――――――
-    def set_mark(self, symbol):
-        if symbol == 'X':
-            self.source = 'assets/wood/X.png'
-        elif symbol == 'O':
-            self.source = 'assets/wood/O.png'
-        elif symbol == '#':
-            self.source = 'assets/wood/obstacle.png'
-        else:
-            self.source = 'assets/wood/cell.png'
 
-class BoardWidget(GridLayout):
+class BoardWidget(Widget):
     """
     View – chỉ nhận lệnh từ controller:
         • reset(board)               – vẽ lại toàn bộ
         • update_cell((i,j), symbol) – đặt quân tại ô
+
+    The whole grid is one widget: every cell is a background Rectangle
+    plus a piece Rectangle on the canvas, so a 19×19 board costs 722
+    instructions instead of 361 widgets.  Touches are mapped to a cell
+    with plain arithmetic and a move only touches its own piece.
     """
-    def __init__(self, board, on_cell_cb, **kw):
-        super().__init__(rows=CELLS_PER_SIDE, cols=CELLS_PER_SIDE,
-                         spacing=0, size_hint=(None, None), **kw)
-        self.size = (CELL_SIZE * CELLS_PER_SIDE,
-                     CELL_SIZE * CELLS_PER_SIDE)
-
-        self._cells = {}
-        for i in range(CELLS_PER_SIDE):
-            for j in range(CELLS_PER_SIDE):
-                c = XOCell(i, j, on_cell_cb)
-                self.add_widget(c)
-                self._cells[(i, j)] = c
 
-        # chặn cửa sổ nhỏ hơn bàn cờ
-        Window.minimum_width  = CELL_SIZE * CELLS_PER_SIDE   # 400
-        Window.minimum_height = CELL_SIZE * CELLS_PER_SIDE   # 400
+    def __init__(self, board, on_cell_cb: Callable[[int, int], None],
+                 theme: Optional[Theme] = None, **kw):
+        super().__init__(**kw)
+        self._cb = on_cell_cb
+        self._theme = theme or load_theme("moc")
+        self._marks: List[str] = []
+        self._rows = self._cols = 0
+        self._cell = 0.0
+        self._origin = (0.0, 0.0)
+        self._bg: List[Rectangle] = []
+        self._pieces: List[Rectangle] = []
+        self.bind(pos=self._layout, size=self._layout)
+        self.reset(board)
 
     # ------------------- public API dùng trong layout ---------------------
     def reset(self, board):
-        for (i, j), cell in self._cells.items(): 
-            if board.is_obstacle(i, j): 
-                cell.set_mark('#') 
-                cell.disabled = True
-            else: 
-                cell.set_mark('') 
-                cell.disabled = False
-
-    def update_cell(self, coords, symbol):
-        self._cells[coords].set_mark(symbol)
-        self._cells[coords].disabled = True
+        """Redraw every cell; rebuilds the canvas only if the shape changed."""
+        if (board.rows, board.cols) != (self._rows, self._cols):
+            self._build(board.rows, board.cols)
+        for i in range(self._rows):
+            for j in range(self._cols):
+                idx = i * self._cols + j
+                if board.is_obstacle(i, j):
+                    self._set_piece(idx, '#')
+                else:
+                    symbol = board.get(i, j)
+                    self._set_piece(idx, '' if symbol == board.EMPTY else symbol)
+
+    def update_cell(self, coords: Tuple[int, int], symbol: str):
+        i, j = coords
+        self._set_piece(i * self._cols + j, symbol)
+
+    def set_theme(self, theme: Theme):
+        """Swap every texture in place; the canvas itself is kept."""
+        self._theme = theme
+        empty = theme.texture('')
+        for idx, mark in enumerate(self._marks):
+            self._bg[idx].texture = empty
+            if mark:
+                self._pieces[idx].texture = theme.texture(mark)
+
+    def cell_at(self, x: float, y: float) -> Optional[Tuple[int, int]]:
+        """(row, col) under window point (x, y), or None outside the grid."""
+        if not self._cell:
+            return None
+        ox, oy = self._origin
+        col = int((x - ox) // self._cell)
+        row = self._rows - 1 - int((y - oy) // self._cell)   # row 0 on top
+        if 0 <= row < self._rows and 0 <= col < self._cols:
+            return row, col
+        return None
+
+    # ------------------- touch: press + release on the same cell ----------
+    def on_touch_down(self, touch):
+        cell = self.cell_at(*touch.pos) if self.collide_point(*touch.pos) else None
+        if cell is None or self.disabled:
+            return super().on_touch_down(touch)
+        if self._marks[cell[0] * self._cols + cell[1]]:
+            return True
+        touch.grab(self)
+        touch.ud[self] = cell
+        return True
+
+    def on_touch_up(self, touch):
+        if touch.grab_current is not self:
+            return super().on_touch_up(touch)
+        touch.ungrab(self)
+        cell = touch.ud.get(self)
+        if cell is not None and cell == self.cell_at(*touch.pos):
+            self._cb(*cell)
+        return True
+
+    # ------------------- canvas ------------------------------------------
+    def _build(self, rows: int, cols: int):
+        self._rows, self._cols = rows, cols
+        self.canvas.clear()
+        empty = self._theme.texture('')
+        with self.canvas:
+            self._bg = [Rectangle(texture=empty) for _ in range(rows * cols)]
+            self._pieces = [Rectangle(size=(0, 0)) for _ in range(rows * cols)]
+        self._marks = [''] * (rows * cols)
+        # chặn cửa sổ nhỏ hơn bàn cờ
+        Window.minimum_width = max(MIN_SIDE, MIN_CELL * cols)
+        Window.minimum_height = max(MIN_SIDE, MIN_CELL * rows)
+        self._layout()
+
+    def _set_piece(self, idx: int, symbol: str):
+        rect = self._pieces[idx]
+        self._marks[idx] = symbol
+        if symbol:
+            rect.texture = self._theme.texture(symbol)
+            rect.size = (self._cell, self._cell)
+        else:
+            rect.size = (0, 0)          # empty cell: nothing drawn on top
+
+    def _layout(self, *_):
+        """Largest square cells that fit, grid centred in the widget."""
+        if not self._rows:
+            return
+        cell = min(self.width / self._cols, self.height / self._rows)
+        ox = self.x + (self.width - cell * self._cols) / 2
+        oy = self.y + (self.height - cell * self._rows) / 2
+        self._cell, self._origin = cell, (ox, oy)
+        size = (cell, cell)
+        for i in range(self._rows):
+            y = oy + (self._rows - 1 - i) * cell
+            for j in range(self._cols):
+                idx = i * self._cols + j
+                pos = (ox + j * cell, y)
+                self._bg[idx].pos, self._bg[idx].size = pos, size
+                self._pieces[idx].pos = pos
+                if self._marks[idx]:
+                    self._pieces[idx].size = size
@@ -0,0 +1,30 @@
+# zobrist.py
+import random
+from functools import lru_cache
+from typing import Dict, Iterable, Tuple
+
+# Same symbols as Board; not imported to keep board.py free of cycles.
+SYMBOLS = ("X", "O", "#")
+
+
+@lru_cache(maxsize=None)
+def zobrist_keys(rows: int, cols: int) -> Dict[str, Tuple[int, ...]]:
+    """64-bit random keys per symbol and cell index (``i * cols + j``).
+
+    Seeded from the board shape, so a position hashes to the same value
+    in every process and every run.
+    """
+    rng = random.Random(f"zobrist-{rows}x{cols}")
+    return {
+        sym: tuple(rng.getrandbits(64) for _ in range(rows * cols))
+        for sym in SYMBOLS
+    }
+
+
+def obstacle_key(rows: int, cols: int, obstacles: Iterable[int]) -> int:
+    """Base key of an empty position: the XOR of its obstacle keys."""
+    keys = zobrist_keys(rows, cols)["#"]
+    key = 0
+    for idx in obstacles:
+        key ^= keys[idx]
+    return key